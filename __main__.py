@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=__main__.py
+
+Command line interface: python -m path_utils {scan,sequences,parse}
+Results are written as newline delimited JSON or TSV while they are found.
+The modules of a subcommand are only imported when it runs, so startup
+stays fast.
+
+Examples:
+    python -m path_utils scan /show -p exr='\\.exr$' -p dpx='\\.dpx$'
+    python -m path_utils sequences /show -p '\\.exr$' --level 4
+    find /show -name '*.exr' | python -m path_utils parse --format tsv
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import argparse
+import json
+import os
+import re
+import sys
+
+
+# Number of images parse sends to a pool process at once
+PARSE_CHUNK_SIZE = 1000
+
+# Leading global inline flags of a regex e.g. (?i)
+_RE_GLOBAL_FLAGS = re.compile(r'\(\?([aiLmsux]+)\)')
+
+
+def _get_patterns(options):
+    """
+    Labeled patterns of the -p options, label=regex or a plain regex.
+
+    :return: <dict>; label: regex string
+    """
+
+    patterns = {}
+    for pattern in options.pattern or ['']:
+        label, sep, regex = pattern.partition('=')
+        if not sep or not label.isidentifier():
+            label, regex = pattern, pattern
+        patterns[label] = regex
+    return patterns
+
+
+def _get_excludes(options):
+    """
+    walk2 excludes of the --exclude, --exclude-dir options.
+    """
+
+    if options.exclude and options.exclude_dir:
+        raise SystemExit('Use either --exclude or --exclude-dir.')
+    return options.exclude or options.exclude_dir or None
+
+
+def _combine(patterns):
+    """
+    One regex string matching any of the patterns.
+
+    Global inline flags e.g. (?s) are only allowed at the start of a regex,
+    they are turned into flags scoped to their own pattern.
+    """
+
+    if len(patterns) == 1:
+        return next(iter(patterns.values()))
+    regexes = []
+    for regex in patterns.values():
+        flags = ''
+        match = _RE_GLOBAL_FLAGS.match(regex)
+        while match is not None:
+            flags += match.group(1)
+            regex = regex[match.end():]
+            match = _RE_GLOBAL_FLAGS.match(regex)
+        if flags:
+            regex = '(?{}:{})'.format(flags, regex)
+        regexes.append('(?:{})'.format(regex))
+    return '|'.join(regexes)
+
+
+def _write(out, options, record, columns):
+    """
+    Write one result as JSON object or TSV row.
+    """
+
+    if options.format == 'json':
+        out.write(json.dumps(record) + '\n')
+    else:
+        out.write('\t'.join('' if record[column] is None
+                            else str(record[column])
+                            for column in columns) + '\n')
+
+
+def _write_header(out, options, columns):
+    if options.format == 'tsv' and options.header:
+        out.write('\t'.join(columns) + '\n')
+
+
+def _cmd_scan(options, out):
+    """
+    Scan the roots, one line per found file.
+    """
+
+    from . import os_path
+
+    patterns = _get_patterns(options)
+    labeled = len(patterns) > 1
+    columns = (('label',) if labeled else ()) + ('dirpath', 'filename')
+    _write_header(out, options, columns)
+    kwargs = {'followlinks': options.followlinks, 'level': options.level,
+              'excludes': _get_excludes(options)}
+
+    if options.processes:
+        from . import process_scan
+
+        if options.workers or options.cycles:
+            raise SystemExit('--workers and --cycles can not be used with '
+                             '--processes.')
+        classify = os_path._get_classifier(patterns)
+        hits = process_scan.scan_roots(
+            options.roots, _combine(patterns), processes=options.processes,
+            split=options.split, onerror=_report_error, **kwargs)
+        for root, dirpath, filename in hits:
+            for label in classify(filename):
+                record = {'label': label, 'dirpath': dirpath,
+                          'filename': filename}
+                _write(out, options, record, columns)
+        return
+
+    for root in options.roots:
+        hits = os_path.scan_folder_multi(root, patterns,
+                                         workers=options.workers,
+                                         cycles=options.cycles, **kwargs)
+        for label, dirpath, filename in hits:
+            record = {'label': label, 'dirpath': dirpath,
+                      'filename': filename}
+            _write(out, options, record, columns)
+
+
+def _cmd_sequences(options, out):
+    """
+    Scan the roots, one line per frame sequence.
+    """
+
+    from . import sequence
+
+    columns = ('path', 'pattern', 'frames', 'count')
+    _write_header(out, options, columns)
+    search_pattern = _combine(_get_patterns(options))
+    for root in options.roots:
+        sequences = sequence.scan_sequences(
+            root, search_pattern, followlinks=options.followlinks,
+            level=options.level, excludes=_get_excludes(options))
+        for frame_sequence in sequences:
+            record = {'path': frame_sequence.path,
+                      'pattern': frame_sequence.get_pattern(),
+                      'frames': frame_sequence.get_frame_range(),
+                      'count': len(frame_sequence)}
+            _write(out, options, record, columns)
+
+
+def _parse_image(image, major_minor=False):
+    """
+    Image dict of an image path plus the image itself.
+    """
+
+    from . import imagepath
+
+    record = {'image': image}
+    record.update(imagepath.parse_image(image, major_minor))
+    return record
+
+
+def _parse_images(images, major_minor=False):
+    """
+    Records of a chunk of images, parsed in a pool process.
+    """
+
+    return [_parse_image(image, major_minor) for image in images]
+
+
+def _iter_stdin():
+    for line in sys.stdin:
+        line = line.rstrip('\n')
+        if line:
+            yield line
+
+
+def _pool_parse(pool, images, major_minor, processes):
+    """
+    Parse images on a pool, feeding chunks as results are written.
+
+    At most two chunks per process are queued, so a large input e.g. from
+    stdin is not read ahead of the output.
+    """
+
+    import collections
+    import itertools
+
+    pending = collections.deque()
+    while True:
+        while len(pending) < processes * 2:
+            chunk = list(itertools.islice(images, PARSE_CHUNK_SIZE))
+            if not chunk:
+                break
+            pending.append(pool.apply_async(_parse_images,
+                                            (chunk, major_minor)))
+        if not pending:
+            return
+        for record in pending.popleft().get():
+            yield record
+
+
+def _cmd_parse(options, out):
+    """
+    Parse image paths of the arguments or stdin, one line per image.
+    """
+
+    from . import imagepath
+
+    columns = ('image',) + imagepath.IMAGE_FIELDS
+    _write_header(out, options, columns)
+    if not options.images or options.images == ['-']:
+        images = _iter_stdin()
+    else:
+        images = iter(options.images)
+
+    if options.processes:
+        import multiprocessing
+
+        pool = multiprocessing.Pool(options.processes)
+        records = _pool_parse(pool, images, options.major_minor,
+                              options.processes)
+    else:
+        pool = None
+        records = (_parse_image(image, options.major_minor)
+                   for image in images)
+
+    try:
+        for record in records:
+            version = record['version']
+            if isinstance(version, tuple) and options.format == 'tsv':
+                record['version'] = record['version_sep'].join(version)
+            _write(out, options, record, columns)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def _report_error(root, err):
+    sys.stderr.write('{}: {}\n'.format(root, err))
+
+
+def _add_walk_arguments(parser):
+    parser.add_argument('roots', nargs='+', metavar='ROOT',
+                        help='search root folders')
+    parser.add_argument('-p', '--pattern', action='append',
+                        help='search regex, label=regex to label the '
+                             'results; repeat for several patterns')
+    parser.add_argument('--level', type=int, default=False,
+                        help='folder search level depth')
+    parser.add_argument('--exclude', help='dirname regex to exclude')
+    parser.add_argument('--exclude-dir', action='append',
+                        help='dirname to exclude; repeatable')
+    parser.add_argument('--followlinks', action='store_true',
+                        help='walk into symlinked folders')
+
+
+def _add_output_arguments(parser):
+    parser.add_argument('--format', choices=('json', 'tsv'), default='json',
+                        help='newline delimited JSON or TSV rows')
+    parser.add_argument('--header', action='store_true',
+                        help='write a TSV header row')
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m path_utils',
+        description='Scan folders and parse vfx image paths.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scan = subparsers.add_parser('scan', help='find files')
+    _add_walk_arguments(scan)
+    _add_output_arguments(scan)
+    scan.add_argument('--workers', type=int,
+                      help='list directories on a thread pool; not with '
+                           '--processes')
+    scan.add_argument('--processes', type=int,
+                      help='scan the roots on a process pool')
+    scan.add_argument('--split', action='store_true',
+                      help='with --processes, scan top-level folders of '
+                           'the roots as separate tasks')
+    scan.add_argument('--cycles', choices=('skip', 'report', 'canonical'),
+                      help='with --followlinks, walk each folder once; not '
+                           'with --processes')
+    scan.set_defaults(func=_cmd_scan)
+
+    sequences = subparsers.add_parser('sequences',
+                                      help='find frame sequences')
+    _add_walk_arguments(sequences)
+    _add_output_arguments(sequences)
+    sequences.set_defaults(func=_cmd_sequences)
+
+    parse = subparsers.add_parser('parse', help='parse image paths')
+    parse.add_argument('images', nargs='*', metavar='IMAGE',
+                       help='image paths, read from stdin if none or -')
+    _add_output_arguments(parse)
+    parse.add_argument('--major-minor', action='store_true',
+                       help='versions use major, minor style')
+    parse.add_argument('--processes', type=int,
+                       help='parse on a process pool')
+    parse.set_defaults(func=_cmd_parse)
+    return parser
+
+
+def main(args=None):
+    options = _build_parser().parse_args(args)
+    try:
+        options.func(options, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # output closed early e.g. by head, do not fail on the final flush
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except OSError as err:
+        sys.stderr.write('{}\n'.format(err))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=async_path.py
+
+asyncio counterparts of os_path.walk2 and os_path.scan_folder.
+The directory listings run in an executor with a bounded number of listings
+in flight, so the event loop is never blocked by the filesystem.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import asyncio
+import os
+import re
+
+from . import os_path
+
+
+async def async_walk2(top, onerror=None, followlinks=False, level=False,
+                      excludes=None, concurrency=4, executor=None):
+    """
+    Async iterator version of os_path.walk2, always topdown.
+
+    At most concurrency directories are listed at the same time and new
+    listings are only started while the caller keeps iterating. The
+    directories are yielded as their listing completes. Like walk2, dirnames
+    can be modified in place to prune the walk. Closing or cancelling the
+    iteration cancels all pending listings.
+
+    :param top: <string>; see os.walk
+    :param onerror: <function>; see os.walk
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :param concurrency: <int>; max number of listings in flight
+    :param executor: <concurrent.futures.Executor>; default loop executor
+                     if None
+    :returns: <async generator>; dirpath, dirnames, filenames
+    """
+
+    loop = asyncio.get_running_loop()
+    is_excluded = os_path._get_exclude_test(excludes)
+    top = await loop.run_in_executor(executor, os_path._check_top, top, level)
+
+    stack = [(top, 0)]
+    running = {}
+    try:
+        while stack or running:
+            while stack and len(running) < concurrency:
+                dirpath, depth = stack.pop()
+                errors = []
+                task = loop.run_in_executor(executor, os_path._scan_dir,
+                                            dirpath, errors.append)
+                running[task] = (dirpath, depth, errors)
+
+            done = (await asyncio.wait(
+                running, return_when=asyncio.FIRST_COMPLETED))[0]
+            for task in done:
+                dirpath, depth, errors = running.pop(task)
+                listing = task.result()
+                if onerror is not None:
+                    for err in errors:
+                        onerror(err)
+                if listing is None:
+                    continue
+                dir_entries, file_entries = listing
+
+                if is_excluded is not None:
+                    dir_entries = [e for e in dir_entries
+                                   if not is_excluded(e.name)]
+                dirnames = [e.name for e in dir_entries]
+
+                # yield result
+                yield dirpath, dirnames, [e.name for e in file_entries]
+
+                # level
+                if level and depth >= level:
+                    continue
+
+                entries = dict((e.name, e) for e in dir_entries)
+                for dirname in reversed(dirnames):
+                    entry = entries.get(dirname)
+                    if entry is not None:
+                        new_path = entry.path
+                        is_link = os_path._is_symlink(entry)
+                    else:
+                        new_path = os.path.join(dirpath, dirname)
+                        is_link = os.path.islink(new_path)
+                    if followlinks or not is_link:
+                        stack.append((new_path, depth + 1))
+    finally:
+        for task in running:
+            task.cancel()
+
+
+async def async_scan_folder(path, search_pattern, followlinks=False,
+                            level=False, excludes=None, concurrency=4,
+                            executor=None):
+    """
+    Async iterator version of os_path.scan_folder.
+
+    :param path: <string>; search root path
+    :param search_pattern: <regex string>
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :param concurrency: <int>; max number of listings in flight
+    :param executor: <concurrent.futures.Executor>; default loop executor
+                     if None
+    :return: <async generator>; found files
+    """
+
+    # Compile search pattern regex
+    try:
+        re_search = re.compile(search_pattern, re.IGNORECASE)
+    except TypeError:
+        raise TypeError('Expected regex search string')
+
+    # Check the path
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(executor, os.path.isdir, path):
+        raise OSError('Path does not exist')
+
+    # Do the scan
+    path = os.path.normpath(path)
+    walk_gen = async_walk2(path, followlinks=followlinks, level=level,
+                           excludes=excludes, concurrency=concurrency,
+                           executor=executor)
+    async for dirpath, dirnames, filenames in walk_gen:
+        for filename in filenames:
+            if re_search.search(filename):
+                yield dirpath, filename
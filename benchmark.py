@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=benchmark.py
+
+Reproducible benchmarks on synthetic show trees.
+A tree of sequence/shot folders with version folders and frame sequences is
+generated in a temp dir per scale. walk2, scan_folder and the Image
+operations are timed on it and reported as JSON with throughput, peak memory
+and os call counts. A stored report can be passed as baseline to fail on
+throughput regressions.
+
+Usage: python -m path_utils.benchmark [--scales small,medium] [--out FILE]
+                                      [--baseline FILE] [--tolerance 0.2]
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from . import imagepath
+from . import os_path
+
+
+# Tree parameters per scale
+SCALES = {
+    'small': {'depth': 2, 'fanout': 4, 'versions': 2, 'frames': 10},
+    'medium': {'depth': 3, 'fanout': 6, 'versions': 3, 'frames': 20},
+    'large': {'depth': 3, 'fanout': 10, 'versions': 3, 'frames': 100},
+}
+
+# os functions counted as calls to the filesystem
+COUNTED_CALLS = ('scandir', 'listdir', 'stat', 'lstat')
+
+# Image operations run on the first images of a tree
+MAX_IMAGES = 100000
+
+
+def make_show_tree(root, depth=3, fanout=6, versions=3, frames=20,
+                   version_folders=True, first_frame=1001):
+    """
+    Generate a synthetic show tree of empty files.
+
+    Every folder below root has fanout sub folders down to depth levels,
+    e.g. sq010/sh0010. Each leaf holds versions v001.. with a frame sequence
+    leaf_comp_v001.1001.exr.. inside; without version folders the versioned
+    sequences are written into the leaf itself.
+
+    :params root: existing folder to fill
+    :type root: str
+    :params depth: folder levels below root
+    :type depth: int
+    :params fanout: sub folders per folder
+    :type fanout: int
+    :params versions: versions per leaf
+    :type versions: int
+    :params frames: frames per sequence
+    :type frames: int
+    :params version_folders: put each version in its own folder
+    :type version_folders: bool
+    :params first_frame: first frame number
+    :type first_frame: int
+    :return: number of files
+    :rtype: int
+    """
+
+    leaves = [(root, 'show')]
+    for level in range(depth):
+        leaves = [(os.path.join(path, '{}{:03d}0'.format(
+                       'sq' if level == 0 else 'sh', index + 1)),
+                   '{}_{:03d}0'.format(name, index + 1))
+                  for path, name in leaves for index in range(fanout)]
+
+    count = 0
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    for path, name in leaves:
+        for version in range(1, versions + 1):
+            version_name = 'v{:03d}'.format(version)
+            if version_folders:
+                folder = os.path.join(path, version_name)
+            else:
+                folder = path
+            os.makedirs(folder, exist_ok=True)
+            template = os.path.join(folder, '{}_comp_{}.{{:04d}}.exr'.format(
+                name, version_name))
+            for frame in range(first_frame, first_frame + frames):
+                os.close(os.open(template.format(frame), flags, 0o644))
+            count += frames
+    return count
+
+
+@contextlib.contextmanager
+def count_calls(names=COUNTED_CALLS):
+    """
+    Count calls of os functions while the context is active.
+
+    Only calls through the os module are seen, stat calls a DirEntry makes
+    internally are not.
+
+    :params names: os function names
+    :type names: tuple(str)
+    :return: name: call count, filled while active
+    :rtype: dict
+    """
+
+    counts = dict.fromkeys(names, 0)
+    originals = dict((name, getattr(os, name)) for name in names)
+
+    def wrap(name, func):
+        def counted(*args, **kwargs):
+            counts[name] += 1
+            return func(*args, **kwargs)
+        return counted
+
+    for name, func in originals.items():
+        setattr(os, name, wrap(name, func))
+    try:
+        yield counts
+    finally:
+        for name, func in originals.items():
+            setattr(os, name, func)
+
+
+def measure(func, repeat=3):
+    """
+    Time a benchmark function and record its memory peak and os calls.
+
+    The time is the best of repeat runs, memory and calls are recorded in
+    two extra runs so the tracing does not distort the timing.
+
+    :params func: function returning the number of processed items
+    :type func: function
+    :params repeat: number of timed runs
+    :type repeat: int
+    :return: items, seconds, items_per_sec, peak_memory, calls
+    :rtype: dict
+    """
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = func()
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    with count_calls() as calls:
+        func()
+
+    return {'items': items,
+            'seconds': round(best, 6),
+            'items_per_sec': round(items / best, 1) if best else None,
+            'peak_memory': peak_memory,
+            'calls': calls}
+
+
+def get_benchmarks(root):
+    """
+    Benchmark functions of a generated tree.
+
+    :params root: tree root
+    :type root: str
+    :return: (name, function) pairs
+    :rtype: list(tuple)
+    """
+
+    images = [os.path.join(dirpath, filename) for dirpath, filename in
+              os_path.scan_folder(root, r'\.exr$')][:MAX_IMAGES]
+
+    def walk2():
+        return sum(1 for _ in os_path.walk2(root))
+
+    def scan_folder():
+        return sum(1 for _ in os_path.scan_folder(root, r'\.exr$'))
+
+    def image_init():
+        for image in images:
+            imagepath.Image(image)
+        return len(images)
+
+    def get_image_values():
+        for image in images:
+            imagepath.Image(image).get_image_values()
+        return len(images)
+
+    # the setters change the image, every run gets fresh images
+    def set_frame():
+        for image in images:
+            imagepath.Image(image).set_frame(1)
+        return len(images)
+
+    def set_version():
+        for image in images:
+            imagepath.Image(image).set_version(7)
+        return len(images)
+
+    return [('walk2', walk2), ('scan_folder', scan_folder),
+            ('image_init', image_init),
+            ('get_image_values', get_image_values),
+            ('set_frame', set_frame), ('set_version', set_version)]
+
+
+def run(scales=('small', 'medium'), repeat=3, tmp_dir=None):
+    """
+    Generate the trees and run all benchmarks.
+
+    :params scales: names of SCALES to run
+    :type scales: list(str)
+    :params repeat: number of timed runs per benchmark
+    :type repeat: int
+    :params tmp_dir: parent folder of the generated trees
+    :type tmp_dir: str
+    :return: report with environment and results
+    :rtype: dict
+    """
+
+    report = {'python': platform.python_version(),
+              'platform': platform.platform(),
+              'repeat': repeat,
+              'results': []}
+    for scale in scales:
+        params = SCALES[scale]
+        root = tempfile.mkdtemp(prefix='path_utils_bench_', dir=tmp_dir)
+        try:
+            files = make_show_tree(root, **params)
+            for name, func in get_benchmarks(root):
+                result = {'benchmark': name, 'scale': scale,
+                          'files': files}
+                result.update(measure(func, repeat))
+                report['results'].append(result)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return report
+
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Find benchmarks slower than a baseline report.
+
+    :params report: report of run
+    :type report: dict
+    :params baseline: stored report of run
+    :type baseline: dict
+    :params tolerance: allowed relative throughput loss
+    :type tolerance: float
+    :return: (benchmark, scale, baseline items_per_sec, items_per_sec)
+    :rtype: list(tuple)
+    """
+
+    expected = dict(((r['benchmark'], r['scale']), r['items_per_sec'])
+                    for r in baseline['results'])
+    regressions = []
+    for result in report['results']:
+        key = (result['benchmark'], result['scale'])
+        if expected.get(key) and result['items_per_sec'] is not None and \
+                result['items_per_sec'] < expected[key] * (1 - tolerance):
+            regressions.append(key + (expected[key],
+                                      result['items_per_sec']))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m path_utils.benchmark',
+        description='Benchmark path_utils on synthetic show trees.')
+    parser.add_argument('--scales', default='small,medium',
+                        help='comma separated: ' + ', '.join(sorted(SCALES)))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tmp-dir', help='parent folder of the trees')
+    parser.add_argument('--out', help='write the JSON report to a file')
+    parser.add_argument('--baseline', help='JSON report to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative throughput loss')
+    options = parser.parse_args(args)
+
+    scales = options.scales.split(',')
+    for scale in scales:
+        if scale not in SCALES:
+            parser.error('Unknown scale \"{}\".'.format(scale))
+
+    report = run(scales, options.repeat, options.tmp_dir)
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if options.out:
+        with open(options.out, 'w') as out_file:
+            out_file.write(output + '\n')
+    else:
+        print(output)
+
+    if options.baseline:
+        with open(options.baseline) as baseline_file:
+            regressions = compare(report, json.load(baseline_file),
+                                  options.tolerance)
+        for benchmark, scale, expected, actual in regressions:
+            sys.stderr.write('Regression {} {}: {} -> {} items/s\n'.format(
+                benchmark, scale, expected, actual))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
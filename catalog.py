@@ -0,0 +1,415 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=catalog.py
+
+Queryable SQLite catalog of parsed image values.
+Scan results of os_path.scan_folder are parsed with imagepath and stored with
+an index on base name, version, version folder, frame and extension, so
+common lookups do not touch the filesystem.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import itertools
+import os
+import sqlite3
+
+from . import imagepath
+from . import os_path
+from . import sequence
+
+
+# Number of images inserted per transaction
+BATCH_SIZE = 10000
+
+# Catalog columns: the image dict fields plus file and number columns and
+# the version free base_name and base_path shared by all versions of a shot
+_COLUMNS = ('image', 'filename') + imagepath.IMAGE_FIELDS + (
+    'version_number', 'version_minor_number', 'frame_number', 'base_name',
+    'base_path')
+_INDICES = (('base_name', 'base_path', 'version_number'),
+            ('name', 'version_number'), ('version',), ('version_folder',),
+            ('frame_number',), ('frame_padding',), ('ext',), ('path',))
+
+
+def _encode(value):
+    """
+    Bind text as os.fsencode bytes, names that are not valid UTF-8 can not be
+    bound as TEXT.
+    """
+
+    return os.fsencode(value) if isinstance(value, str) else value
+
+
+def _decode(value):
+    return os.fsdecode(value) if isinstance(value, bytes) else value
+
+
+def get_base_name(name, major_minor=False):
+    """
+    Remove the file version from an image base name, e.g. sh010_v001 -> sh010.
+
+    :params name: image base name
+    :type name: str
+    :params major_minor: Set to True if the version is using
+                         major, minor version style
+    :type major_minor: bool
+    :return: base name without version prefix and version
+    :rtype: str
+    """
+
+    if not name:
+        return name
+    if major_minor:
+        match = imagepath.RE_NAME_MAJOR_MINOR.match(name)
+        if match.group('version_prefix') is None:
+            return name
+        start, end = match.start('version_prefix'), match.end('version_minor')
+    else:
+        match = imagepath.RE_NAME.match(name)
+        if match.group('version_prefix') is not None:
+            start = match.start('version_prefix')
+            end = max(match.end('version_prefix'), match.end('version'))
+        elif match.group('version_only_prefix') is not None:
+            start = match.start('version_only_prefix')
+            end = match.end('version_only')
+        else:
+            return name
+    return name[:start] + name[end:]
+
+
+def get_base_path(image_path, version_folder_level):
+    """
+    Blank the version folder of an image folder, e.g. /s/sh010/v001 ->
+    /s/sh010/
+
+    :params image_path: image folder
+    :type image_path: str
+    :params version_folder_level: see Image.get_version
+    :type version_folder_level: int
+    :return: folder without the version folder name
+    :rtype: str
+    """
+
+    if not version_folder_level:
+        return image_path
+    folders = image_path.split(os.sep)
+    folders[-version_folder_level] = ''
+    return os.sep.join(folders)
+
+
+class Catalog(object):
+    """
+    Indexed on disk catalog of image values
+    """
+
+    def __init__(self, catalog_file, major_minor=False, timeout=60):
+        """
+        Init the catalog.
+
+        :params catalog_file: path of the SQLite catalog file
+        :type catalog_file: str
+        :params major_minor: Set to True if the versions are using
+                             major, minor version style
+        :type major_minor: bool
+        :params timeout: seconds to wait for a lock held by another process
+        :type timeout: float
+        """
+        self.catalog_file = catalog_file
+        self.major_minor = major_minor
+
+        # private vars
+        self._db = sqlite3.connect(catalog_file, timeout=timeout)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS images ({}, '
+                             'UNIQUE (path, filename))'.format(
+                                 ', '.join(_COLUMNS)))
+            columns = tuple(row[1] for row in self._db.execute(
+                'PRAGMA table_info(images)'))
+            if columns != _COLUMNS:
+                self._db.close()
+                error_msg = ('Catalog \"{}\" was written by an older '
+                             'version, remove it and scan again.')
+                raise ValueError(error_msg.format(catalog_file))
+            for index in _INDICES:
+                self._db.execute('CREATE INDEX IF NOT EXISTS images_{} '
+                                 'ON images ({})'.format('_'.join(index),
+                                                         ', '.join(index)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM images').fetchone()[0]
+
+    def close(self):
+        """
+        Close the catalog file.
+        """
+
+        self._db.close()
+
+    def _insert(self, images):
+        """
+        Parse and insert images in batches, without committing.
+
+        :params images: image paths
+        :type images: iterable(str)
+        :return: number of inserted images
+        :rtype: int
+        """
+
+        count = 0
+        sql = 'INSERT OR REPLACE INTO images VALUES ({})'.format(
+            ', '.join('?' * len(_COLUMNS)))
+        images = iter(images)
+        while True:
+            batch = list(itertools.islice(images, BATCH_SIZE))
+            if not batch:
+                return count
+            parsed = imagepath.parse_many(batch, self.major_minor)
+            rows = []
+            for index, image in enumerate(batch):
+                image_dict = parsed[index]
+                # store major, minor versions as one string
+                version = image_dict['version']
+                if isinstance(version, tuple):
+                    image_dict['version'] = image_dict['version_sep'].join(
+                        version)
+                row = ((image, os.path.basename(image)) +
+                       tuple(image_dict[f] for f in imagepath.IMAGE_FIELDS) +
+                       (parsed.version_numbers[index],
+                        parsed.version_minor_numbers[index],
+                        parsed.frame_numbers[index],
+                        get_base_name(image_dict['name'], self.major_minor),
+                        get_base_path(image_dict['path'],
+                                      image_dict['version_folder_level'])))
+                rows.append(tuple(_encode(value) for value in row))
+            self._db.executemany(sql, rows)
+            count += len(rows)
+
+    def add_images(self, images):
+        """
+        Parse and add images, one transaction per batch.
+
+        :params images: image paths
+        :type images: iterable(str)
+        :return: number of added images
+        :rtype: int
+        """
+
+        count = 0
+        images = iter(images)
+        while True:
+            with self._db:
+                added = self._insert(itertools.islice(images, BATCH_SIZE))
+            if not added:
+                return count
+            count += added
+
+    def _scan_images(self, path, search_pattern, **kwargs):
+        """
+        Full image paths of an os_path.scan_folder scan.
+        """
+
+        for dirpath, filename in os_path.scan_folder(path, search_pattern,
+                                                     **kwargs):
+            yield os.path.join(dirpath, filename)
+
+    def scan(self, path, search_pattern, **kwargs):
+        """
+        Scan a folder and add all found images.
+
+        :params path: search root path
+        :type path: str
+        :params search_pattern: regex string
+        :type search_pattern: str
+        :params kwargs: see os_path.scan_folder
+        :return: number of added images
+        :rtype: int
+        """
+
+        return self.add_images(self._scan_images(path, search_pattern,
+                                                 **kwargs))
+
+    def _subtree_where(self, path):
+        """
+        Where clause and values matching all images below a folder.
+        """
+
+        path = os.path.normpath(path).rstrip(os.sep) or os.sep
+        prefix = path.rstrip(os.sep) + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        return ('(path = ? OR (path >= ? AND path < ?))',
+                (_encode(path), _encode(prefix), _encode(upper)))
+
+    def remove(self, path):
+        """
+        Remove all images below a folder.
+
+        :params path: folder path
+        :type path: str
+        :return: number of removed images
+        :rtype: int
+        """
+
+        where, values = self._subtree_where(path)
+        with self._db:
+            cursor = self._db.execute('DELETE FROM images WHERE ' + where,
+                                      values)
+        return cursor.rowcount
+
+    def refresh(self, path, search_pattern, **kwargs):
+        """
+        Rescan a folder and replace its images in one transaction.
+
+        Readers see either the old or the new state of the subtree.
+
+        :params path: search root path
+        :type path: str
+        :params search_pattern: regex string
+        :type search_pattern: str
+        :params kwargs: see os_path.scan_folder
+        :return: number of images in the subtree
+        :rtype: int
+        """
+
+        where, values = self._subtree_where(path)
+        images = self._scan_images(path, search_pattern, **kwargs)
+        with self._db:
+            self._db.execute('DELETE FROM images WHERE ' + where, values)
+            return self._insert(images)
+
+    def query(self, order_by=None, **fields):
+        """
+        Get the catalog rows matching all given field values.
+
+        :params order_by: column name(s) to sort by
+        :type order_by: str|list(str)
+        :params fields: column=value pairs; None matches missing values
+        :return: row dicts with the image dict keys plus image, filename,
+                 version_number, version_minor_number, frame_number,
+                 base_name and base_path
+        :rtype: generator(dict)
+        """
+
+        where, values = self._get_where(fields)
+        sql = 'SELECT * FROM images' + where
+        if order_by:
+            if isinstance(order_by, str):
+                order_by = [order_by]
+            for column in order_by:
+                self._check_column(column)
+            sql += ' ORDER BY ' + ', '.join(order_by)
+        for row in self._db.execute(sql, values):
+            yield dict(zip(_COLUMNS, (_decode(value) for value in row)))
+
+    def _check_column(self, column):
+        """
+        Raise on unknown column names, they are used in the sql string.
+        """
+
+        if column not in _COLUMNS:
+            error_msg = 'Unknown catalog column \"{}\".'.format(column)
+            raise ValueError(error_msg)
+
+    def _get_where(self, fields):
+        """
+        Where clause and values of column=value pairs.
+        """
+
+        clauses = []
+        values = []
+        for column, value in sorted(fields.items()):
+            self._check_column(column)
+            if value is None:
+                clauses.append(column + ' IS NULL')
+            else:
+                clauses.append(column + ' = ?')
+                values.append(_encode(value))
+        if not clauses:
+            return '', values
+        return ' WHERE ' + ' AND '.join(clauses), values
+
+    def get_latest_version(self, name, **fields):
+        """
+        Get the highest file version number of a base name.
+
+        All versions of the name are considered, in any version folder.
+
+        :params name: image base name with or without version,
+                      e.g. sh010 or sh010_v001
+        :type name: str
+        :params fields: additional column=value filters e.g. base_path
+        :return: version number or None
+        :rtype: int
+        """
+
+        fields['base_name'] = get_base_name(name, self.major_minor)
+        where, values = self._get_where(fields)
+        row = self._db.execute('SELECT MAX(version_number) FROM images' +
+                               where + ' AND version_number >= 0',
+                               values).fetchone()
+        return row[0]
+
+    def get_latest_frames(self, name, **fields):
+        """
+        Get all frames of a base name at its highest file version.
+
+        :params name: image base name with or without version,
+                      e.g. sh010 or sh010_v001
+        :type name: str
+        :params fields: additional column=value filters e.g. base_path
+        :return: row dicts sorted by path and frame; see query
+        :rtype: list(dict)
+        """
+
+        version_number = self.get_latest_version(name, **fields)
+        if version_number is None:
+            return []
+        fields['base_name'] = get_base_name(name, self.major_minor)
+        fields['version_number'] = version_number
+        return list(self.query(order_by=('path', 'frame_number'), **fields))
+
+    def get_sequences(self, **fields):
+        """
+        Get the frame sequences of all images matching the field values.
+
+        :params fields: column=value pairs e.g. frame_padding=4
+        :return: frame sequences
+        :rtype: list(sequence.FrameSequence)
+        """
+
+        where, values = self._get_where(fields)
+        where += ' AND ' if where else ' WHERE '
+        sql = ('SELECT path, name, frame_prefix, frame_padding, ext, '
+               'frame_number FROM images' + where + 'frame_number >= 0 '
+               'ORDER BY path, name, frame_prefix, frame_padding, ext')
+        rows = self._db.execute(sql, values)
+        return [sequence.FrameSequence.from_frames(
+                    *(tuple(_decode(value) for value in key) +
+                      ([row[5] for row in group],)))
+                for key, group in itertools.groupby(rows,
+                                                    lambda row: row[:5])]
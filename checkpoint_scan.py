@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=checkpoint_scan.py
+
+Resumable os_path.scan_folder for very large trees.
+The scan state is the stack of pending directories plus the position in the
+directory being yielded. It is written to a checkpoint file periodically and
+when the scan is stopped, and a new scan with the same checkpoint file
+continues from there. The pending paths are stored front coded and zlib
+compressed, as neighbouring stack entries share most of their path.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import json
+import os
+import re
+import time
+import zlib
+
+from . import os_path
+
+
+# Checkpoint file format version
+VERSION = 2
+# Path separator of the stored frontier, not allowed in file names
+SEP = '\0'
+
+
+def _encode_frontier(stack):
+    """
+    Front code and compress (dirpath, depth) tuples.
+
+    :param stack: <list>; (dirpath, depth) tuples
+    :return: <bytes>
+    """
+
+    parts = []
+    previous = ''
+    for dirpath, depth in stack:
+        common = len(os.path.commonprefix((previous, dirpath)))
+        parts.append('{} {} {}'.format(depth, common, dirpath[common:]))
+        previous = dirpath
+    return zlib.compress(SEP.join(parts).encode('utf-8', 'surrogateescape'))
+
+
+def _decode_frontier(data):
+    """
+    Decode the (dirpath, depth) tuples of _encode_frontier.
+
+    :param data: <bytes>
+    :return: <list>; (dirpath, depth) tuples
+    """
+
+    text = zlib.decompress(data).decode('utf-8', 'surrogateescape')
+    stack = []
+    previous = ''
+    for part in text.split(SEP) if text else []:
+        depth, common, suffix = part.split(' ', 2)
+        dirpath = previous[:int(common)] + suffix
+        stack.append((dirpath, int(depth)))
+        previous = dirpath
+    return stack
+
+
+class ResumableScan(object):
+    """
+    scan_folder that can be stopped and continued through a checkpoint file
+    """
+
+    def __init__(self, path, search_pattern, checkpoint_file, interval=60,
+                 followlinks=False, level=False, excludes=None):
+        """
+        Init the scan, load the checkpoint if there is one.
+
+        :param path: <string>; search root path
+        :param search_pattern: <regex string>
+        :param checkpoint_file: <string>; path of the checkpoint file
+        :param interval: <float>; seconds between checkpoints, None only
+                         writes one when the scan is stopped
+        :param followlinks: <boolean>; see os.walk
+        :param level: <int>; folder search level depth
+        :param excludes: <regex string>|<list>
+        """
+
+        # Compile search pattern regex
+        try:
+            self._re_search = re.compile(search_pattern, re.IGNORECASE)
+        except TypeError:
+            raise TypeError('Expected regex search string')
+
+        # Check the path
+        if not os.path.isdir(path):
+            raise OSError('Path does not exist')
+
+        self.path = os_path._check_top(os.path.normpath(path), level)
+        self.checkpoint_file = checkpoint_file
+        self.interval = interval
+        self.followlinks = followlinks
+        self.level = level
+        # number of results yielded by this and all previous runs
+        self.emitted = 0
+
+        # private vars
+        self._is_excluded = os_path._get_exclude_test(excludes)
+        self._options = {'path': self.path, 'search_pattern': search_pattern,
+                         'followlinks': followlinks, 'level': level,
+                         'excludes': repr(excludes)}
+        self._stack = [(self.path, 0)]
+        # directory being yielded: dirpath, depth, last yielded filename
+        self._current = None
+        self._finished = False
+        self._load()
+
+    def _load(self):
+        """
+        Restore the state of an existing checkpoint file.
+        """
+
+        try:
+            with open(self.checkpoint_file, 'rb') as checkpoint:
+                header = checkpoint.readline()
+                data = checkpoint.read()
+        except FileNotFoundError:
+            return
+
+        header = json.loads(header.decode('utf-8'))
+        if header.get('version') != VERSION:
+            error_msg = 'Unsupported checkpoint version \"{}\".'
+            raise ValueError(error_msg.format(header.get('version')))
+        if header['options'] != self._options:
+            error_msg = 'Checkpoint \"{}\" belongs to a different scan.'
+            raise ValueError(error_msg.format(self.checkpoint_file))
+        self.emitted = header['emitted']
+        self._current = header['current'] and tuple(header['current'])
+        self._stack = _decode_frontier(data)
+
+    def save(self):
+        """
+        Write the checkpoint file.
+
+        All results yielded so far count as emitted. Save after storing the
+        output of the last result for a resume without duplicates.
+        """
+
+        if self._finished:
+            return
+        header = {'version': VERSION, 'options': self._options,
+                  'emitted': self.emitted, 'current': self._current,
+                  'pending': len(self._stack)}
+        tmp_file = self.checkpoint_file + '.tmp'
+        with open(tmp_file, 'wb') as checkpoint:
+            checkpoint.write(json.dumps(header).encode('utf-8') + b'\n')
+            checkpoint.write(_encode_frontier(self._stack))
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def _list_dir(self, dirpath, depth, push):
+        """
+        List a directory, push its sub-directories to the stack.
+
+        :return: <list>; sorted matching filenames
+        """
+
+        listing = os_path._scan_dir(dirpath)
+        if listing is None:
+            return []
+        dir_entries, file_entries = listing
+
+        if push and not (self.level and depth >= self.level):
+            is_excluded = self._is_excluded
+            for entry in reversed(dir_entries):
+                if is_excluded is not None and is_excluded(entry.name):
+                    continue
+                if not self.followlinks and os_path._is_symlink(entry):
+                    continue
+                self._stack.append((entry.path, depth + 1))
+
+        re_search = self._re_search
+        return sorted(e.name for e in file_entries if re_search.search(e.name))
+
+    def __iter__(self):
+        """
+        Scan, continuing from the checkpoint.
+
+        The files of a directory are yielded sorted, so a directory stopped
+        in between continues after the last yielded file name, also if files
+        were added or removed in the meantime. The checkpoint file is
+        removed when the scan completes.
+
+        :return: <generator>; dirpath, filename of found files
+        """
+
+        last_save = time.time()
+        try:
+            while self._current is not None or self._stack:
+                if self._current is None:
+                    dirpath, depth = self._stack.pop()
+                    filenames = self._list_dir(dirpath, depth, True)
+                else:
+                    # sub-directories were pushed before the checkpoint
+                    dirpath, depth, last = self._current
+                    filenames = [f for f in
+                                 self._list_dir(dirpath, depth, False)
+                                 if f > last]
+
+                for filename in filenames:
+                    self._current = (dirpath, depth, filename)
+                    self.emitted += 1
+                    yield dirpath, filename
+
+                    if self.interval is not None and \
+                            time.time() - last_save >= self.interval:
+                        self.save()
+                        last_save = time.time()
+                self._current = None
+
+                # directories without matches are checkpointed as well
+                if self.interval is not None and \
+                        time.time() - last_save >= self.interval:
+                    self.save()
+                    last_save = time.time()
+
+            self._finished = True
+            try:
+                os.remove(self.checkpoint_file)
+            except FileNotFoundError:
+                pass
+        finally:
+            self.save()
+
+
+def resumable_scan_folder(path, search_pattern, checkpoint_file, interval=60,
+                          followlinks=False, level=False, excludes=None):
+    """
+    scan_folder continuing from a checkpoint file; see ResumableScan
+
+    :param path: <string>; search root path
+    :param search_pattern: <regex string>
+    :param checkpoint_file: <string>; path of the checkpoint file
+    :param interval: <float>; seconds between checkpoints
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :return: <generator>; found files
+    """
+
+    return iter(ResumableScan(path, search_pattern, checkpoint_file,
+                              interval, followlinks, level, excludes))
@@ -31,44 +31,566 @@ __author__ = 'Wilfried Pollan'
 
 
 # MODULES
+import itertools
 import os.path
 import re
+import threading
+from array import array
+from collections import OrderedDict
+
+
+# GRAMMAR
+# All patterns are compiled once on import. The name grammars pull the file
+# version and the frame parts out of an image name in a single match, the
+# folder grammar does the same for one folder of the image path.
+RE_MAJOR_VERSION = re.compile(r'^([v|V])(\d+)')
+RE_PREFIX_MAJOR_VERSION = re.compile(r'([.|_|-])([v|V])(\d+)*')
+RE_PREFIX_MAJOR_MINOR_VERSION = re.compile(
+    r'([.|_|-])([v|V])(\d+)([.|_|-])(\d+)')
+RE_FRAME = re.compile(r'([.|_|-])((\d+)|(%0\dd)|(#+))\Z')
+RE_FRAME_ONLY = re.compile(r'^((\d+)|(%0\dd)|(#+))\Z')
+
+_FRAME_GRAMMAR = (r'(?:(?:(?P<name>.*?)(?P<frame_prefix>[.|_|-]))?'
+                  r'(?P<frame>(?P<frame_digit>\d+)|(?P<frame_notation>%0\dd)'
+                  r'|(?P<frame_hash>#+))|(?P<name_only>.*))\Z')
+RE_NAME = re.compile(
+    r'(?:(?=.*?(?P<version_prefix>[.|_|-][v|V])(?P<version>\d+)*)'
+    r'|(?=(?P<version_only_prefix>[v|V])(?P<version_only>\d+)))?'
+    + _FRAME_GRAMMAR, re.DOTALL)
+RE_NAME_MAJOR_MINOR = re.compile(
+    r'(?:(?=.*?(?P<version_prefix>[.|_|-][v|V])(?P<version>\d+)'
+    r'(?P<version_sep>[.|_|-])(?P<version_minor>\d+)))?'
+    + _FRAME_GRAMMAR, re.DOTALL)
+RE_FOLDER = re.compile(
+    r'(?:.*?(?P<version_prefix>[.|_|-][v|V])(?P<version>\d+)*'
+    r'|(?P<version_only_prefix>[v|V])(?P<version_only>\d+))', re.DOTALL)
+
+
+# Keys of the image dict, see Image.get_image_values
+IMAGE_FIELDS = ('path', 'name', 'ext', 'version_folder_level',
+                'version_folder_prefix', 'version_folder', 'version_prefix',
+                'version', 'version_sep', 'frame_prefix', 'frame',
+                'frame_padding', 'frame_notation', 'frame_hash')
+# Value of the integer frame/version columns if there is no number
+NO_NUMBER = -1
+
+# Digit runs of a natural sort key
+RE_DIGITS = re.compile(r'(\d+)')
+
+
+def _parse_name(name, major_minor=False):
+    """
+    Split an image name with a single grammar match.
+
+    :params name: image name without extension
+    :type name: str
+    :params major_minor: Set to True if the version is using
+                         major, minor version style
+    :type major_minor: bool
+    :return: name_list, version_prefix, version, version_sep
+             name_list as returned by Image._split_name but as tuple,
+             as it is shared through the parse cache
+    :rtype: tuple
+    """
+
+    if major_minor:
+        match = RE_NAME_MAJOR_MINOR.match(name)
+        version_prefix, version_sep = match.group('version_prefix',
+                                                  'version_sep')
+        version = None
+        if version_prefix:
+            version = match.group('version', 'version_minor')
+    else:
+        match = RE_NAME.match(name)
+        version_prefix, version = match.group('version_prefix', 'version')
+        if version_prefix is None:
+            version_prefix, version = match.group('version_only_prefix',
+                                                  'version_only')
+        version_sep = None
+
+    if match.group('frame'):
+        name_list = match.group('name', 'frame_prefix', 'frame',
+                                'frame_digit', 'frame_notation', 'frame_hash')
+    else:
+        name_list = (match.group('name_only'), None, None)
+    name_list = tuple(None if v == '' else v for v in name_list)
+
+    return name_list, version_prefix, version, version_sep
+
+
+def _get_frame_values(name_list):
+    """
+    Get the frame values of a split image name.
+
+    :params name_list: name list as returned by Image._split_name
+    :type name_list: list|tuple
+    :return: frame_prefix, frame, padding, frame_digit, frame_notation,
+             frame_hash
+    :rtype: tuple
+    """
+
+    frame_prefix, frame = None, None
+    frame_digit, frame_notation, frame_hash = None, None, None
+    if name_list[2]:
+        frame_prefix, frame, frame_digit, frame_notation, frame_hash = \
+            name_list[1:6]
+
+    # GET FRAME PADDING
+    padding = None
+    if frame_digit:
+        padding = len(frame)
+    elif frame_notation:
+        padding = int(frame_notation[2])
+    elif frame_hash:
+        padding = len(frame_hash)
+
+    # FRAME NOTATION, HASH
+    if padding:
+        if frame:
+            frame_notation = '%0' + str(padding) + 'd'
+            frame_hash = '#' * padding
+        elif frame_notation:
+            frame_hash = '#' * padding
+        elif frame_hash:
+            frame_notation = '%0' + str(padding) + 'd'
+
+    return (frame_prefix, frame, padding, frame_digit, frame_notation,
+            frame_hash)
+
+
+def _get_folder_version(image_path):
+    """
+    Get the version of the closest versioned folder of an image path.
+
+    :params image_path: image directory
+    :type image_path: str
+    :return: version_folder_level, version_folder_prefix, version_folder
+    :rtype: tuple
+    """
+
+    version_folder_prefix = None
+    version_folder = None
+
+    folders = image_path.split(os.sep)
+    level = 1
+    while level < len(folders)-1:
+        match = RE_FOLDER.match(folders[-level])
+        if match:
+            version_folder_prefix, version_folder = match.group(
+                'version_prefix', 'version')
+            if version_folder_prefix is None:
+                version_folder_prefix, version_folder = match.group(
+                    'version_only_prefix', 'version_only')
+
+        if version_folder:
+            break
+        level += 1
+
+    if not version_folder:
+        level = None
+
+    return level, version_folder_prefix, version_folder
+
+
+def parse_image(image, major_minor=False):
+    """
+    Get all image part values without creating an Image object.
+
+    :params image: path to an image file
+    :type image: str
+    :params major_minor: Set to True if the version is using
+                         major, minor version style
+    :type major_minor: bool
+    :return: image_dict; see Image.get_image_values
+    :rtype: dict
+    """
+
+    image_path = os.path.dirname(image)
+    name, ext = os.path.splitext(os.path.basename(image))
+    return _get_image_values(image_path, name, ext, major_minor)
+
+
+def _get_image_values(image_path, name, ext, major_minor=False):
+    """
+    Build the image dict from the basic image parts.
+
+    :return: image_dict; see Image.get_image_values
+    :rtype: dict
+    """
+
+    name_parts = _parse_name(name, major_minor)
+    return _build_image_dict(image_path, ext, name_parts,
+                             _get_frame_values(name_parts[0]),
+                             _get_folder_version(image_path))
+
+
+def _build_image_dict(image_path, ext, name_parts, frame_values,
+                      version_folder_values):
+    """
+    Build the image dict from the parsed value groups.
+
+    :params name_parts: as returned by _parse_name
+    :type name_parts: tuple
+    :params frame_values: as returned by _get_frame_values
+    :type frame_values: tuple
+    :params version_folder_values: as returned by _get_folder_version
+    :type version_folder_values: tuple
+    :return: image_dict; see Image.get_image_values
+    :rtype: dict
+    """
+
+    image_dict = {'path':                  image_path,
+                  'name':                  name_parts[0][0],
+                  'ext':                   ext,
+                  'version_folder_level':  version_folder_values[0],
+                  'version_folder_prefix': version_folder_values[1],
+                  'version_folder':        version_folder_values[2],
+                  'version_prefix':        name_parts[1],
+                  'version':               name_parts[2],
+                  'version_sep':           name_parts[3],
+                  'frame_prefix':          frame_values[0],
+                  'frame':                 frame_values[1],
+                  'frame_padding':         frame_values[2],
+                  'frame_notation':        frame_values[4],
+                  'frame_hash':            frame_values[5]
+                 }
+
+    return image_dict
+
+
+def natural_key(text):
+    """
+    Sort key comparing the digit runs of a string as numbers, e.g. v9 < v10.
+
+    :params text: any string
+    :type text: str
+    :return: alternating str and int parts, always starting with a str
+    :rtype: tuple
+    """
+
+    parts = RE_DIGITS.split(text)
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+def sort_key(image, _keys=None):
+    """
+    Get the sort key of an image path.
+
+    Images sort by folder, base name, frame prefix, extension and frame.
+    Folder and base name compare naturally, so versions in folders and
+    file names incl. major, minor versions sort by number; frames sort by
+    number across mixed padding. The raw strings follow their natural keys
+    and the image ends the key, so equal keys mean equal images.
+
+    :params image: path to an image file
+    :type image: str
+    :return: nat. folder, folder, nat. base name, base name, frame_prefix,
+             ext, frame number, frame padding, image
+    :rtype: tuple
+    """
+
+    image_path = os.path.dirname(image)
+    name, ext = os.path.splitext(os.path.basename(image))
+    name_list = _parse_name(name)[0]
+    if name_list[2] and name_list[3]:
+        frame = int(name_list[2])
+        padding = len(name_list[2])
+    else:
+        frame = NO_NUMBER
+        padding = 0
+
+    b_name = name_list[0] or ''
+    if _keys is None:
+        dir_key = natural_key(image_path)
+        name_key = natural_key(b_name)
+    else:
+        # natural keys shared by the folders and base names of a bulk sort
+        dir_key = _keys.get(image_path)
+        if dir_key is None:
+            dir_key = _keys[image_path] = natural_key(image_path)
+        name_key = _keys.get(b_name)
+        if name_key is None:
+            name_key = _keys[b_name] = natural_key(b_name)
+    return (dir_key, image_path, name_key, b_name, name_list[1] or '', ext,
+            frame, padding, image)
+
+
+def sort_images(images, reverse=False, unique=False):
+    """
+    Sort image paths by their sort_key, computed once per path.
+
+    :params images: image paths
+    :type images: iterable(str)
+    :params reverse: sort descending
+    :type reverse: bool
+    :params unique: drop duplicate paths
+    :type unique: bool
+    :return: image paths
+    :rtype: list(str)
+    """
+
+    natural_keys = {}
+    keys = [sort_key(image, natural_keys) for image in images]
+    if unique:
+        keys = set(keys)
+    keys = sorted(keys, reverse=reverse)
+    return [key[-1] for key in keys]
+
+
+def group_sequences(images, unique=True):
+    """
+    Sort image paths and group them by sequence.
+
+    A sequence is the images of one folder with the same base name, frame
+    prefix and extension; mixed frame padding stays in one sequence.
+
+    :params images: image paths
+    :type images: iterable(str)
+    :params unique: drop duplicate paths
+    :type unique: bool
+    :return: (path, name, frame_prefix, ext), sorted image paths
+    :rtype: generator(tuple)
+    """
+
+    natural_keys = {}
+    keys = [sort_key(image, natural_keys) for image in images]
+    if unique:
+        keys = set(keys)
+    keys = sorted(keys)
+    for group, group_keys in itertools.groupby(
+            keys, lambda key: (key[1], key[3], key[4], key[5])):
+        yield group, [key[-1] for key in group_keys]
+
+
+class ParseCache(object):
+    """
+    Bounded thread safe LRU of immutable image parse results
+
+    Image paths map to their basic parts, name parts and frame values, image
+    folders separately to their folder version, as many files share one
+    version folder. Used by Image.from_path.
+    """
+
+    def __init__(self, max_images=100000, max_dirs=10000):
+        """
+        Init an empty cache.
+
+        :params max_images: max number of cached image paths
+        :type max_images: int
+        :params max_dirs: max number of cached folder versions
+        :type max_dirs: int
+        """
+        self.max_images = max_images
+        self.max_dirs = max_dirs
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0,
+                      'dir_hits': 0, 'dir_misses': 0, 'dir_evictions': 0}
+
+        # private vars
+        self._images = OrderedDict()
+        self._dirs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._images)
+
+    def clear(self):
+        """
+        Drop all cached parse results.
+        """
+
+        with self._lock:
+            self._images.clear()
+            self._dirs.clear()
+
+    def _get(self, cache, key, max_size, parse, prefix):
+        """
+        Look up a key, parse and insert it on a miss.
+        """
+
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+                self.stats[prefix + 'hits'] += 1
+                return value
+            self.stats[prefix + 'misses'] += 1
+
+        value = parse(key)
+        with self._lock:
+            cache[key] = value
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+                self.stats[prefix + 'evictions'] += 1
+        return value
+
+    def get_image(self, image):
+        """
+        Get the parsed values of an image path.
+
+        :params image: path to an image file
+        :type image: str
+        :return: basic_parts, name_parts, frame_values; see Image
+        :rtype: tuple
+        """
+
+        return self._get(self._images, image, self.max_images,
+                         _parse_image_parts, '')
+
+    def get_folder_version(self, image_path):
+        """
+        Get the folder version of an image folder.
+
+        :params image_path: image directory
+        :type image_path: str
+        :return: version_folder_level, version_folder_prefix, version_folder
+        :rtype: tuple
+        """
+
+        return self._get(self._dirs, image_path, self.max_dirs,
+                         _get_folder_version, 'dir_')
+
+
+def _parse_image_parts(image):
+    """
+    Parse the name dependent values of an image path.
+
+    :return: basic_parts, name_parts, frame_values; see Image
+    :rtype: tuple
+    """
+
+    image_name = os.path.basename(image)
+    basic_parts = ((os.path.dirname(image), image_name) +
+                   os.path.splitext(image_name))
+    name_parts = _parse_name(basic_parts[2])
+    return basic_parts, name_parts, _get_frame_values(name_parts[0])
+
+
+# Shared cache of Image.from_path
+PARSE_CACHE = ParseCache()
 
 
 class Image(object):
     """
     Manipulates vfx image values
+
+    The image values are parsed lazily on first access and cached in groups:
+    basic parts, name parts (base name, frame, file version) and folder version.
+    Assigning a new image only drops the groups it changes.
     """
 
-    IMAGE = None
-    IMAGE_DICT = None
+    __slots__ = ('_image', '_basic_parts', '_name_parts', '_frame_values',
+                 '_version_folder_values', '_image_dict')
 
     def __init__(self, image=None):
         """
         Init the inage class.
 
-        It sets up all basic variables for the input image.
+        It only stores the input image, all values are parsed on demand.
 
         :params image: path to an image file
         :type image: str
         """
-        # Init internal vars
-        self.image_path = None
-        self.image_name = None
-        self.name = None
-        self.ext = None
+        # private vars
+        self._image = image
+        self._basic_parts = None
+        self._name_parts = None
+        self._frame_values = None
+        self._version_folder_values = None
+        self._image_dict = None
+
+    @classmethod
+    def from_path(cls, image, cache=None):
+        """
+        Create an image with its values taken from a parse cache.
 
-        # Assign init parm
-        self.IMAGE = image
+        The cached values are immutable and shared, the setters assign a new
+        image and leave the cache untouched.
 
-        # Assign internal vars
-        self._get_basic_parts()
+        :params image: path to an image file
+        :type image: str
+        :params cache: parse cache, the shared PARSE_CACHE if None
+        :type cache: ParseCache
+        :return: image object
+        :rtype: Image
+        """
 
-        # private vars
-        self._name_list = self._split_name()
+        if cache is None:
+            cache = PARSE_CACHE
+        image_obj = cls(image)
+        (image_obj._basic_parts, image_obj._name_parts,
+         image_obj._frame_values) = cache.get_image(image)
+        image_obj._version_folder_values = cache.get_folder_version(
+            image_obj._basic_parts[0])
+        return image_obj
+
+    # PROPERTIES
+    @property
+    def IMAGE(self):
+        """
+        Image path.
+        """
+        return self._image
+
+    @IMAGE.setter
+    def IMAGE(self, image):
+        """
+        Assign a new image path and invalidate the changed value groups.
+
+        The folder version is kept if the image folder did not change.
+        """
+        if (self._version_folder_values is not None and
+                os.path.dirname(image) != os.path.dirname(self._image)):
+            self._version_folder_values = None
+        self._image = image
+        self._basic_parts = None
+        self._name_parts = None
+        self._frame_values = None
+        self._image_dict = None
+
+    @property
+    def IMAGE_DICT(self):
+        """
+        Cached image values; see get_image_values.
+        """
+        if self._image_dict is None:
+            self._image_dict = self.get_image_values()
+        return self._image_dict
+
+    @property
+    def image_path(self):
+        """
+        Image directory.
+        """
+        return self._get_basic_parts()[0]
+
+    @property
+    def image_name(self):
+        """
+        Image file name.
+        """
+        return self._get_basic_parts()[1]
+
+    @property
+    def name(self):
+        """
+        Image file name without extension.
+        """
+        return self._get_basic_parts()[2]
+
+    @property
+    def ext(self):
+        """
+        Image extension.
+        """
+        return self._get_basic_parts()[3]
 
-        # Assign global class vars
-        self.IMAGE_DICT = self.get_image_values()
+    @property
+    def _name_list(self):
+        """
+        Split image name; see _split_name.
+        """
+        return self._split_name()
 
     # REGEX FUNCTIONS
     def _regex_version(self):
@@ -100,30 +622,25 @@ class Image(object):
 
     def _re_compile_version(self):
         """
-        Compile re version object.
+        Get the precompiled re version objects.
 
         :return: re_major_version, re_prefix_major_version,
                  re_prefix_major_minor_version
         :rtype: tuple(re object)
         """
 
-        re_major_version = re.compile(self._regex_version()[0])
-        re_prefix_major_version = re.compile(self._regex_version()[1])
-        re_prefix_major_minor_version = re.compile(self._regex_version()[2])
-        return (re_major_version, re_prefix_major_version,
-                re_prefix_major_minor_version)
+        return (RE_MAJOR_VERSION, RE_PREFIX_MAJOR_VERSION,
+                RE_PREFIX_MAJOR_MINOR_VERSION)
 
     def _re_compile_frame(self):
         """
-        Compile re frame object.
+        Get the precompiled re frame objects.
 
         :return: re_frame, re_frame_only
         :rtype: tuple(re object)
         """
 
-        re_frame = re.compile(self._regex_frame()[0])
-        re_frame_only = re.compile(self._regex_frame()[1])
-        return re_frame, re_frame_only
+        return RE_FRAME, RE_FRAME_ONLY
 
     # HELPER FUNCTIONS
     def _set_padded_number(self, number, padding):
@@ -144,13 +661,39 @@ class Image(object):
         """
         Get path, name, ext
 
-        :return: [dirname, name, ext]
-        :rtype: list(str)
+        :return: (dirname, basename, name, ext)
+        :rtype: tuple(str)
+        """
+
+        if self._basic_parts is None:
+            image_name = os.path.basename(self._image)
+            self._basic_parts = ((os.path.dirname(self._image), image_name) +
+                                 os.path.splitext(image_name))
+        return self._basic_parts
+
+    def _get_name_parts(self):
+        """
+        Get the parsed name parts
+
+        :return: name_list, version_prefix, version, version_sep
+        :rtype: tuple
         """
 
-        self.image_path = os.path.dirname(self.IMAGE)
-        self.image_name = os.path.basename(self.IMAGE)
-        self.name, self.ext = os.path.splitext(self.image_name)
+        if self._name_parts is None:
+            self._name_parts = _parse_name(self.name)
+        return self._name_parts
+
+    def _get_version_folder_values(self):
+        """
+        Get the parsed folder version
+
+        :return: version_folder_level, version_folder_prefix, version_folder
+        :rtype: tuple
+        """
+
+        if self._version_folder_values is None:
+            self._version_folder_values = _get_folder_version(self.image_path)
+        return self._version_folder_values
 
     def _split_name(self):
         """
@@ -163,26 +706,7 @@ class Image(object):
         :rtype: list
         """
 
-        re_frame, re_frame_only = self._re_compile_frame()
-        self._get_basic_parts()
-
-        name_list = []
-        try:
-            name_list = re_frame.split(self.name)
-            if len(name_list) == 1:
-                name_list = re_frame_only.split(self.name)
-                if len(name_list) > 1:
-                    name_list.insert(0, None)
-                else:
-                    name_list.extend([None, None])
-
-            name_list = name_list[:6]
-        except IndexError:
-            pass
-
-        name_list = [None if v is '' else v for v in name_list]
-
-        return name_list
+        return list(self._get_name_parts()[0])
 
     def get_b_name(self):
         """
@@ -209,7 +733,6 @@ class Image(object):
         new_name = new_name + ''.join(name_list[1:3])
 
         self.IMAGE = os.path.join(self.image_path, new_name) + self.ext
-        self._name_list = self._split_name()
 
         return self.IMAGE
 
@@ -229,40 +752,16 @@ class Image(object):
         :rtype: dict
         """
 
-        frame_prefix, frame = None, None
-        frame_digit, frame_notation, frame_hash = None, None, None
-        if self._name_list[2]:
-            frame_prefix = self._name_list[1]
-            frame = self._name_list[2]
-            frame_digit = self._name_list[3]
-            frame_notation = self._name_list[4]
-            frame_hash = self._name_list[5]
-
-        # GET FRAME PADDING
-        padding = None
-        if frame_digit:
-            padding = len(frame)
-        elif frame_notation:
-            padding = int(frame_notation[2])
-        elif frame_hash:
-            padding = len(frame_hash)
-
-        # FRAME NOTATION, HASH
-        if padding:
-            if frame:
-                frame_notation = '%0' + str(padding) + 'd'
-                frame_hash = '#' * padding
-            elif frame_notation:
-                frame_hash = '#' * padding
-            elif frame_hash:
-                frame_notation = '%0' + str(padding) + 'd'
-
-        frame_dict = {'frame_prefix':  frame_prefix,
-                      'frame':         frame,
-                      'frame_padding': padding,
-                      'frame_digit':   frame_digit,
-                      'frame_notation':frame_notation,
-                      'frame_hash':    frame_hash
+        if self._frame_values is None:
+            self._frame_values = _get_frame_values(
+                self._get_name_parts()[0])
+        frame_values = self._frame_values
+        frame_dict = {'frame_prefix':  frame_values[0],
+                      'frame':         frame_values[1],
+                      'frame_padding': frame_values[2],
+                      'frame_digit':   frame_values[3],
+                      'frame_notation':frame_values[4],
+                      'frame_hash':    frame_values[5]
                      }
 
         return frame_dict
@@ -311,15 +810,72 @@ class Image(object):
             frame_prefix = ''
 
         # Assign with existing frame
-        self.name = name_list[0] + frame_prefix + new_frame
-        self.IMAGE = os.path.join(self.image_path, self.name) + self.ext
-
-        # Replace values in internal var
-        self._name_list = self._split_name()
-        self.IMAGE_DICT = self.get_image_values()
+        name = name_list[0] + frame_prefix + new_frame
+        self.IMAGE = os.path.join(self.image_path, name) + self.ext
 
         return self.IMAGE
 
+    def _get_frame_format(self, padding=None, prefix=None):
+        """
+        Get a %-format string of the image with the frame as placeholder.
+
+        :params padding: frame digit padding; default is the image padding
+        :type padding: int
+        :params prefix: character to use before the frame if the image
+                        has none
+        :type prefix: str
+        :return: format string e.g. /path/shot.%04d.exr
+        :rtype: str
+        """
+
+        name_list = ['' if v is None else v for v in self._name_list]
+        frame_prefix = name_list[1] or prefix or ''
+        if padding is None:
+            padding = self.get_frame()['frame_padding'] or 1
+
+        head = os.path.join(self.image_path, name_list[0] + frame_prefix)
+        return (head.replace('%', '%%') + '%0{}d'.format(padding) +
+                self.ext.replace('%', '%%'))
+
+    def iter_frames(self, start, end, step=1, padding=None, prefix=None):
+        """
+        Iterate over the image paths of a frame range.
+
+        The path parts around the frame are built once, so every frame is a
+        single string format.
+
+        :params start: first frame
+        :type start: int
+        :params end: last frame, inclusive
+        :type end: int
+        :params step: frame step
+        :type step: int
+        :params padding: frame digit padding; default is the image padding
+        :type padding: int
+        :params prefix: character to use before the frame if the image
+                        has none
+        :type prefix: str
+        :return: images
+        :rtype: iterator(str)
+        """
+
+        frame_format = self._get_frame_format(padding, prefix)
+        if step > 0:
+            frames = range(start, end + 1, step)
+        else:
+            frames = range(start, end - 1, step)
+        return map(frame_format.__mod__, frames)
+
+    def get_frame_paths(self, start, end, step=1, padding=None, prefix=None):
+        """
+        Get the image paths of a frame range; see iter_frames.
+
+        :return: images
+        :rtype: list(str)
+        """
+
+        return list(self.iter_frames(start, end, step, padding, prefix))
+
     def get_version(self, major_minor=False):
         """
         Get all version strings.
@@ -337,82 +893,13 @@ class Image(object):
         :rtype: dict
         """
 
-        re_version_all = self._re_compile_version()
-        re_version_only = re_version_all[0]
-        re_version = re_version_all[1]
-        re_major_minor_version = re_version_all[2]
-
-        version_folder_prefix = None
-        version_folder = None
-        version_prefix = None
-        version = None
-        version_sep = None
-
-        def get_version_result(value):
-            """
-            Inside method fetching version from input value.
-
-            :param value: image base name
-            :type value: str
-            :return: version_prefix, version
-            :rtype: tuple(str)
-            """
-            re_version_result = re_version.search(value)
-            version_prefix = ''.join(re_version_result.group(1, 2))
-            version = re_version_result.group(3)
-            return version_prefix, version
-
-        def get_version_only_result(value):
-            """
-            Inside method fetching version from input value
-            if the name may only consist of the version.
-
-            :param value: image base name
-            :type value: str
-            :return: version_prefix, version
-            :rtype: tuple(str)
-            """
-            re_version_result = re_version_only.search(value)
-            version_prefix = re_version_result.group(1)
-            version = re_version_result.group(2)
-            return version_prefix, version
-
-        # Get file version
         if major_minor:
-            try:
-                re_version_result_image = re_major_minor_version.search(self.name)
-                version_prefix = ''.join(re_version_result_image.group(1, 2))
-                version = re_version_result_image.group(3, 5)
-                version_sep = re_version_result_image.group(4)
-            except AttributeError:
-                pass
+            name_parts = _parse_name(self.name, major_minor)
         else:
-            try:
-                version_prefix, version = get_version_result(self.name)
-            except AttributeError:
-                try:
-                    version_prefix, version = get_version_only_result(self.name)
-                except AttributeError:
-                    pass
-
-        # Get folder version
-        level = 1
-        while level < len(self.image_path.split(os.sep))-1:
-            image_folder = self.image_path.split(os.sep)[-level]
-            try:
-                version_folder_prefix, version_folder = get_version_result(image_folder)
-            except AttributeError:
-                try:
-                    version_folder_prefix, version_folder = get_version_only_result(image_folder)
-                except AttributeError:
-                    pass
-
-            if version_folder:
-                break
-            level += 1
-
-        if not version_folder:
-            level = None
+            name_parts = self._get_name_parts()
+        version_prefix, version, version_sep = name_parts[1:]
+        level, version_folder_prefix, version_folder = \
+            self._get_version_folder_values()
 
         version_dict = {'version_folder_level':  level,
                         'version_folder_prefix': version_folder_prefix,
@@ -459,14 +946,16 @@ class Image(object):
         version = version_dict['version']
         version_sep = version_dict['version_sep']
 
+        name = self.name
+        image_path = self.image_path
         if version_folder_level > 1:
-            folder_split = self.image_path.split(os.sep)
+            folder_split = image_path.split(os.sep)
             image_root = os.sep.join(folder_split[:-(version_folder_level)])
             image_folder = folder_split[-version_folder_level]
             sub_folder = os.sep.join(folder_split[-(version_folder_level-1):])
         else:
-            image_root = os.path.dirname(self.image_path)
-            image_folder = os.path.basename(self.image_path)
+            image_root = os.path.dirname(image_path)
+            image_folder = os.path.basename(image_path)
             sub_folder = ''
 
         # Assign input parameter
@@ -486,17 +975,17 @@ class Image(object):
                         sub_major = version_prefix + str(new_version[0])
                         sub_minor = version_sep + str(new_version[1])
                         substition = sub_major + sub_minor
-                        self.name = re_major_minor_version.sub(substition, self.name)
+                        name = re_major_minor_version.sub(substition, name)
                     else:
                         substition = version_prefix + str(new_version)
-                        self.name = re_major_minor_version.sub(substition, self.name)
+                        name = re_major_minor_version.sub(substition, name)
                 else:
-                    if re_version.search(self.name):
+                    if re_version.search(name):
                         substition = version_prefix + str(new_version)
-                        self.name = re_version.sub(substition, self.name)
-                    elif re_version_only.search(self.name):
+                        name = re_version.sub(substition, name)
+                    elif re_version_only.search(name):
                         substition = version_prefix + str(new_version)
-                        self.name = re_version_only.sub(substition, self.name)
+                        name = re_version_only.sub(substition, name)
 
             # Set version in folder
             if set_folder:
@@ -511,9 +1000,8 @@ class Image(object):
                         image_folder = re_version_only.sub(substition, image_folder)
 
             # Generate image string
-            self.image_path = os.path.join(image_root, image_folder, sub_folder)
-            self.IMAGE = os.path.join(self.image_path, self.name) + self.ext
-            self._name_list = self._split_name()
+            image_path = os.path.join(image_root, image_folder, sub_folder)
+            self.IMAGE = os.path.join(image_path, name) + self.ext
 
             return self.IMAGE
 
@@ -546,27 +1034,231 @@ class Image(object):
         :rtype: dict
         """
 
-        # FRAME
-        frame_dict = self.get_frame()
+        if major_minor:
+            return _get_image_values(self.image_path, self.name, self.ext,
+                                     major_minor)
 
-        # VERSION
-        version_dict = self.get_version(major_minor)
+        if self._frame_values is None:
+            self._frame_values = _get_frame_values(
+                self._get_name_parts()[0])
+        image_dict = _build_image_dict(self.image_path, self.ext,
+                                       self._get_name_parts(),
+                                       self._frame_values,
+                                       self._get_version_folder_values())
 
-        # GENERATE IMAGE DICT
-        image_dict = {'path':                  self.image_path,
-                      'name':                  self._name_list[0],
-                      'ext':                   self.ext,
-                      'version_folder_level':  version_dict['version_folder_level'],
-                      'version_folder_prefix': version_dict['version_folder_prefix'],
-                      'version_folder':        version_dict['version_folder'],
-                      'version_prefix':        version_dict['version_prefix'],
-                      'version':               version_dict['version'],
-                      'version_sep':           version_dict['version_sep'],
-                      'frame_prefix':          frame_dict['frame_prefix'],
-                      'frame':                 frame_dict['frame'],
-                      'frame_padding':         frame_dict['frame_padding'],
-                      'frame_notation':        frame_dict['frame_notation'],
-                      'frame_hash':            frame_dict['frame_hash']
-                     }
+        return image_dict
+
+
+def parse_many(images, major_minor=False):
+    """
+    Parse many image paths into a column oriented ImageBatch.
+
+    :params images: image paths
+    :type images: iterable(str)
+    :params major_minor: Set to True if the version is using
+                         major, minor version style
+    :type major_minor: bool
+    :return: parsed images
+    :rtype: ImageBatch
+    """
+
+    return ImageBatch(images, major_minor)
+
+
+class ImageBatch(object):
+    """
+    Column oriented image values of many image paths.
+
+    Every field of Image.get_image_values is stored as one column. The image
+    directories are dictionary encoded: each directory and its folder version
+    is stored and parsed once, rows only hold the directory index. The frame
+    and version numbers are additionally kept as integers in typed arrays
+    with NO_NUMBER for missing or non digit values.
+    """
+
+    __slots__ = ('major_minor', 'dirs', 'dir_ids', 'frame_numbers',
+                 'version_numbers', 'version_minor_numbers', '_columns',
+                 '_dir_index', '_dir_values', '_strings')
+
+    # Columns stored per row, the folder version columns are stored per dir
+    _ROW_FIELDS = ('name', 'ext', 'version_prefix', 'version', 'version_sep',
+                   'frame_prefix', 'frame', 'frame_padding', 'frame_notation',
+                   'frame_hash')
+    _DIR_FIELDS = ('version_folder_level', 'version_folder_prefix',
+                   'version_folder')
 
+    def __init__(self, images=None, major_minor=False):
+        """
+        Init the batch.
+
+        :params images: image paths
+        :type images: iterable(str)
+        :params major_minor: Set to True if the version is using
+                             major, minor version style
+        :type major_minor: bool
+        """
+        self.major_minor = major_minor
+        self.dirs = []
+        self.dir_ids = array('L')
+        self.frame_numbers = array('q')
+        self.version_numbers = array('q')
+        self.version_minor_numbers = array('q')
+
+        # private vars
+        self._columns = dict((field, []) for field in self._ROW_FIELDS)
+        self._dir_index = {}
+        self._dir_values = []
+        self._strings = {}
+
+        if images is not None:
+            self.extend(images)
+
+    def __len__(self):
+        return len(self.dir_ids)
+
+    def __getitem__(self, index):
+        """
+        Get the image values of one row.
+
+        :return: image_dict; see Image.get_image_values
+        :rtype: dict
+        """
+        dir_id = self.dir_ids[index]
+        dir_values = self._dir_values[dir_id]
+        image_dict = {'path': self.dirs[dir_id]}
+        for field in IMAGE_FIELDS[1:]:
+            if field in self._columns:
+                image_dict[field] = self._columns[field][index]
+            else:
+                image_dict[field] = dir_values[self._DIR_FIELDS.index(field)]
         return image_dict
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _number(self, value):
+        """
+        Convert a digit string to int.
+
+        :return: number or NO_NUMBER
+        :rtype: int
+        """
+        if value and value.isdigit():
+            number = int(value)
+            if number < 2**63:
+                return number
+        return NO_NUMBER
+
+    def append(self, image):
+        """
+        Parse and add a single image path.
+
+        :params image: path to an image file
+        :type image: str
+        """
+
+        self.extend((image,))
+
+    def extend(self, images):
+        """
+        Parse and add image paths.
+
+        :params images: image paths
+        :type images: iterable(str)
+        """
+
+        major_minor = self.major_minor
+        dirs = self.dirs
+        dir_index = self._dir_index
+        intern = self._strings.setdefault
+        number = self._number
+        dirname, basename, splitext = (os.path.dirname, os.path.basename,
+                                       os.path.splitext)
+        appends = [self._columns[field].append for field in self._ROW_FIELDS]
+        (add_name, add_ext, add_version_prefix, add_version, add_version_sep,
+         add_frame_prefix, add_frame, add_frame_padding, add_frame_notation,
+         add_frame_hash) = appends
+        add_dir_id = self.dir_ids.append
+        add_frame_number = self.frame_numbers.append
+        add_version_number = self.version_numbers.append
+        add_version_minor_number = self.version_minor_numbers.append
+
+        for image in images:
+            image_path = dirname(image)
+            dir_id = dir_index.get(image_path)
+            if dir_id is None:
+                dir_id = dir_index[image_path] = len(dirs)
+                dirs.append(image_path)
+                self._dir_values.append(_get_folder_version(image_path))
+            add_dir_id(dir_id)
+
+            name, ext = splitext(basename(image))
+            name_list, version_prefix, version, version_sep = _parse_name(
+                name, major_minor)
+            (frame_prefix, frame, frame_padding, frame_digit, frame_notation,
+             frame_hash) = _get_frame_values(name_list)
+
+            if major_minor and version:
+                add_version_number(number(version[0]))
+                add_version_minor_number(number(version[1]))
+            else:
+                add_version_number(number(version))
+                add_version_minor_number(NO_NUMBER)
+                version = intern(version, version)
+            add_frame_number(number(frame_digit))
+
+            add_name(intern(name_list[0], name_list[0]))
+            add_ext(intern(ext, ext))
+            add_version_prefix(intern(version_prefix, version_prefix))
+            add_version(version)
+            add_version_sep(version_sep)
+            add_frame_prefix(intern(frame_prefix, frame_prefix))
+            add_frame(intern(frame, frame))
+            add_frame_padding(frame_padding)
+            add_frame_notation(intern(frame_notation, frame_notation))
+            add_frame_hash(intern(frame_hash, frame_hash))
+
+    def column(self, field):
+        """
+        Get all values of one field.
+
+        :params field: key of the image dict; see IMAGE_FIELDS
+        :type field: str
+        :return: field values in row order
+        :rtype: list
+        """
+
+        if field == 'path':
+            dirs = self.dirs
+            return [dirs[dir_id] for dir_id in self.dir_ids]
+        elif field in self._columns:
+            return list(self._columns[field])
+        elif field in self._DIR_FIELDS:
+            position = self._DIR_FIELDS.index(field)
+            dir_values = [values[position] for values in self._dir_values]
+            return [dir_values[dir_id] for dir_id in self.dir_ids]
+
+        error_msg = 'Unknown field \"{}\".'.format(field)
+        raise KeyError(error_msg)
+
+    def group_by(self, field):
+        """
+        Group the row indices by the values of a field.
+
+        :params field: key of the image dict; see IMAGE_FIELDS
+        :type field: str
+        :return: {value: row indices}
+        :rtype: dict
+        """
+
+        groups = {}
+        if field == 'path':
+            for index, dir_id in enumerate(self.dir_ids):
+                groups.setdefault(dir_id, array('L')).append(index)
+            return dict((self.dirs[dir_id], indices)
+                        for dir_id, indices in groups.items())
+
+        for index, value in enumerate(self.column(field)):
+            groups.setdefault(value, array('L')).append(index)
+        return groups
@@ -18,20 +18,431 @@
 """
 file=os_path.py
 
-Two functions that build on top of os.walk. They extend the basic behavior to a
-more granually walk and a scan of directory for files containing a given regex.
+Functions that build on top of os.scandir. They extend the basic os.walk
+behavior to a more granually walk and a scan of directory for files containing
+a given regex.
 """
 
 __author__ = 'Wilfried Pollan'
 
 
 # Imports
+import bisect
+import errno
+import heapq
 import os
 import re
+import threading
+import time
+from concurrent import futures
+
+
+# Upper bounds in seconds of the WalkStats listing latency buckets
+LATENCY_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+
+# Policies for directories reached again through symlinks
+CYCLE_POLICIES = ('skip', 'report', 'canonical')
+
+# Listings per worker parallel_walk2 keeps running or done ahead of the caller
+PREFETCH = 4
+
+
+class WalkStats(object):
+    """
+    Counters and listing timings of a walk or scan
+
+    Pass an instance as walk_stats to walk2, parallel_walk2, scan_folder or
+    scan_folder_multi. Without it the walks skip all timing and counting.
+    """
+
+    def __init__(self, slowest=10, callback=None):
+        """
+        Init empty stats.
+
+        :param slowest: <int>; number of slowest directories to keep
+        :param callback: <function>; called with dirpath, seconds, entries
+                         of every listed directory
+        """
+        self.dirs_listed = 0
+        self.entries = 0
+        self.files = 0
+        self.errors = 0
+        self.dirs_excluded = 0
+        self.dirs_level_pruned = 0
+        self.dirs_seen_before = 0
+        self.regex_evals = 0
+        self.matches = 0
+        self.list_seconds = 0.0
+        # listing count per LATENCY_BUCKETS bound, the last one is unbounded
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.callback = callback
+
+        # private vars
+        self._max_slowest = slowest
+        self._slowest = []
+
+    def __str__(self):
+        lines = ['dirs listed: {} ({:.3f}s), entries: {}, files: {}, '
+                 'errors: {}'.format(self.dirs_listed, self.list_seconds,
+                                     self.entries, self.files, self.errors),
+                 'dirs pruned by excludes: {}, by level: {}, seen before: '
+                 '{}'.format(self.dirs_excluded, self.dirs_level_pruned,
+                             self.dirs_seen_before),
+                 'regex evaluations: {}, matches: {}'.format(
+                     self.regex_evals, self.matches)]
+        bounds = ['<{}s'.format(b) for b in LATENCY_BUCKETS] + ['more']
+        lines.append('listing latency: ' + ', '.join(
+            '{} {}'.format(b, c) for b, c in zip(bounds, self.histogram)))
+        for seconds, dirpath in self.get_slowest():
+            lines.append('    {:.6f}s {}'.format(seconds, dirpath))
+        return '\n'.join(lines)
+
+    def add_listing(self, dirpath, seconds, dirs, files):
+        """
+        Record one directory listing.
+
+        :param dirpath: <string>; listed directory
+        :param seconds: <float>; listing time
+        :param dirs: <int>; number of sub-directories
+        :param files: <int>; number of files
+        """
+
+        self.dirs_listed += 1
+        self.entries += dirs + files
+        self.files += files
+        self.list_seconds += seconds
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if len(self._slowest) < self._max_slowest:
+            heapq.heappush(self._slowest, (seconds, dirpath))
+        elif self._slowest and seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, dirpath))
+        if self.callback is not None:
+            self.callback(dirpath, seconds, dirs + files)
+
+    def get_slowest(self):
+        """
+        Get the slowest listed directories.
+
+        :return: <list>; (seconds, dirpath) tuples, slowest first
+        """
+
+        return sorted(self._slowest, reverse=True)
+
+    def as_dict(self):
+        """
+        Get all counters and timings.
+
+        :return: <dict>
+        """
+
+        return {'dirs_listed': self.dirs_listed, 'entries': self.entries,
+                'files': self.files, 'errors': self.errors,
+                'dirs_excluded': self.dirs_excluded,
+                'dirs_level_pruned': self.dirs_level_pruned,
+                'dirs_seen_before': self.dirs_seen_before,
+                'regex_evals': self.regex_evals, 'matches': self.matches,
+                'list_seconds': self.list_seconds,
+                'histogram': dict(zip([str(b) for b in LATENCY_BUCKETS] +
+                                      ['inf'], self.histogram)),
+                'slowest': self.get_slowest()}
+
+
+def _get_exclude_test(excludes):
+    """
+    Build the dirname exclude test used by walk2.
+
+    :param excludes: <regex string>|<list>
+    :return: <function>|<None>; returns True for excluded dirnames
+    """
+
+    if excludes is None:
+        return None
+
+    # Compile re expression
+    try:
+        re_excludes = re.compile(excludes)
+    except TypeError:
+        re_excludes = None
+
+    if re_excludes is None:
+        return lambda d: d in excludes
+    elif isinstance(excludes, str):
+        return lambda d: d in excludes or re_excludes.match(d) is not None
+    return lambda d: re_excludes.match(d) is not None
+
+
+def _scan_dir(dirpath, onerror=None):
+    """
+    List a directory split into dir and file entries.
+
+    :param dirpath: <string>; directory to list
+    :param onerror: <function>; see os.walk
+    :return: <tuple>; dir_entries, file_entries or <None> if listing failed
+    """
+
+    try:
+        scandir_it = os.scandir(dirpath)
+    except OSError as err:
+        if onerror is not None:
+            onerror(err)
+        return None
+
+    dir_entries = []
+    file_entries = []
+    with scandir_it:
+        while True:
+            try:
+                entry = next(scandir_it)
+            except StopIteration:
+                break
+            except OSError as err:
+                if onerror is not None:
+                    onerror(err)
+                return None
+
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                dir_entries.append(entry)
+            else:
+                file_entries.append(entry)
+
+    return dir_entries, file_entries
+
+
+def _is_symlink(entry):
+    """
+    Symlink test of a DirEntry like os.path.islink, without raising.
+
+    :param entry: <os.DirEntry>
+    :return: <boolean>
+    """
+
+    try:
+        return entry.is_symlink()
+    except OSError:
+        return False
+
+
+def _check_top(top, level):
+    """
+    Prepare the walk root like walk2 does for the level option.
+
+    :param top: <string>; walk root
+    :param level: <int>; folder search level depth
+    :return: <string>; walk root
+    """
+
+    if level:
+        top = top.rstrip(os.path.sep)
+        assert os.path.isdir(top)
+    return top
+
+
+class _CycleGuard(object):
+    """
+    Tracks the (st_dev, st_ino) of walked directories when following links
+    """
+
+    def __init__(self, policy, top, stats=None, walk_stats=None):
+        """
+        Init the guard with the walk root.
+
+        :param policy: <string>; one of CYCLE_POLICIES
+        :param top: <string>; walk root
+        :param stats: <dict>; scandir_walk syscall counts
+        :param walk_stats: <WalkStats>
+        """
+        if policy not in CYCLE_POLICIES:
+            error_msg = 'Unknown cycle policy \"{}\", expected one of {}.'
+            raise ValueError(error_msg.format(policy, CYCLE_POLICIES))
+        self.policy = policy
+        self.stats = stats
+        self.walk_stats = walk_stats
+        self.lock = threading.Lock()
+
+        # (st_dev, st_ino): path the directory is walked as
+        self.seen = {}
+        if policy == 'canonical':
+            top = os.path.realpath(top)
+        self.top = top
+        try:
+            st = os.stat(top)
+        except OSError:
+            return
+        self.seen[(st.st_dev, st.st_ino)] = top
+
+    def visit(self, entry, path, onerror=None):
+        """
+        Check a sub-directory before walking it.
+
+        :param entry: <os.DirEntry>|<None>; entry of path if listed
+        :param path: <string>; sub-directory path
+        :param onerror: <function>; gets an ELOOP error with policy report
+        :return: <string>|<None>; path to walk it as, None if seen before
+        """
+
+        try:
+            if isinstance(entry, os.DirEntry):
+                st = entry.stat()
+            else:
+                st = os.stat(path)
+        except OSError:
+            # let the listing fail and report it
+            return path
+        if self.stats is not None:
+            self.stats['stat'] += 1
+
+        key = (st.st_dev, st.st_ino)
+        with self.lock:
+            first = self.seen.get(key)
+            if first is None:
+                if self.policy == 'canonical' and (
+                        _is_symlink(entry) if isinstance(entry, os.DirEntry)
+                        else os.path.islink(path)):
+                    path = os.path.realpath(path)
+                self.seen[key] = path
+                return path
+            if self.walk_stats is not None:
+                self.walk_stats.dirs_seen_before += 1
+
+        if self.policy == 'report' and onerror is not None:
+            onerror(OSError(errno.ELOOP,
+                            'Directory already walked as ' + first, path))
+        return None
+
+
+def scandir_walk(top, topdown=True, onerror=None, followlinks=False,
+                 level=False, excludes=None, stats=None, walk_stats=None,
+                 cycles=None):
+    """
+    os.scandir based walk engine with the walk2 options.
+
+    Yields the os.DirEntry objects of each directory, so is_dir/is_file and
+    the stat data cached by scandir can be used without extra syscalls.
+    The depth is carried along as integer and excluded dirnames are removed
+    before descending. Like os.walk the dir_entries list can be modified in
+    place when walking topdown; plain dirnames are accepted as well.
+
+    :param top: <string>; see os.walk
+    :param topdown: <boolean>; see os.walk
+    :param onerror: <function>; see os.walk
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :param stats: <dict>; counts 'scandir', 'stat' and 'stat_saved'; the
+                  latter are the symlink checks walk2 did with os.walk that
+                  are served from the cached entries
+    :param walk_stats: <WalkStats>; record listings and pruned directories
+    :param cycles: <string>; with followlinks, walk each directory only
+                   once by its (st_dev, st_ino), at the cost of one stat per
+                   directory; 'skip' ignores directories seen before,
+                   'report' passes an ELOOP error to onerror as well and
+                   'canonical' walks symlinked directories under their real
+                   path; None walks like os.walk
+    :returns: <generator>; dirpath, dir_entries, file_entries
+    """
+
+    is_excluded = _get_exclude_test(excludes)
+    if stats is None:
+        stats = {}
+    for key in ('scandir', 'stat', 'stat_saved'):
+        stats.setdefault(key, 0)
+
+    # level
+    if level:
+        stats['stat'] += 1
+    top = _check_top(top, level)
+
+    # symlink cycles
+    guard = None
+    if cycles is not None:
+        guard = _CycleGuard(cycles, top, stats, walk_stats)
+        if followlinks:
+            top = guard.top
+        else:
+            guard = None
+
+    stack = [(top, 0)]
+    while stack:
+        dirpath, depth = stack.pop()
+
+        # Yield the parent after its sub-directories if going bottom up
+        if isinstance(dirpath, tuple):
+            yield dirpath
+            continue
+
+        stats['scandir'] += 1
+        if walk_stats is None:
+            listing = _scan_dir(dirpath, onerror)
+        else:
+            start = time.perf_counter()
+            listing = _scan_dir(dirpath, onerror)
+            if listing is None:
+                walk_stats.errors += 1
+            else:
+                walk_stats.add_listing(dirpath, time.perf_counter() - start,
+                                       len(listing[0]), len(listing[1]))
+        if listing is None:
+            continue
+        dir_entries, file_entries = listing
+
+        if not topdown:
+            walk_entries = [e for e in dir_entries
+                            if followlinks or not _is_symlink(e)]
+
+        # modify dir_entries in place
+        if is_excluded is not None:
+            count = len(dir_entries)
+            dir_entries[:] = [e for e in dir_entries if not is_excluded(e.name)]
+            if walk_stats is not None:
+                walk_stats.dirs_excluded += count - len(dir_entries)
+
+        if not topdown:
+            stack.append(((dirpath, dir_entries, file_entries), None))
+            for entry in reversed(walk_entries):
+                new_path = entry.path
+                if guard is not None:
+                    new_path = guard.visit(entry, new_path, onerror)
+                    if new_path is None:
+                        continue
+                stack.append((new_path, depth + 1))
+            continue
+
+        # yield result
+        yield dirpath, dir_entries, file_entries
+
+        # level
+        if level and depth >= level:
+            if walk_stats is not None:
+                walk_stats.dirs_level_pruned += len(dir_entries)
+            continue
+
+        for entry in reversed(dir_entries):
+            if isinstance(entry, os.DirEntry):
+                new_path = entry.path
+                if not followlinks:
+                    stats['stat_saved'] += 1
+                    if _is_symlink(entry):
+                        continue
+            else:
+                new_path = os.path.join(dirpath, entry)
+                if not followlinks:
+                    stats['stat'] += 1
+                    if os.path.islink(new_path):
+                        continue
+            if guard is not None:
+                new_path = guard.visit(entry, new_path, onerror)
+                if new_path is None:
+                    continue
+            stack.append((new_path, depth + 1))
 
 
 def walk2(top, topdown=True, onerror=None, followlinks=False, level=False,
-          excludes=None):
+          excludes=None, walk_stats=None, cycles=None):
     """
     Add options to os.walk:
         exclusive filtering for dirnames, filenames (list or regex)
@@ -43,42 +454,176 @@ def walk2(top, topdown=True, onerror=None, followlinks=False, level=False,
     :param followlinks: <boolean>; see os.walk
     :param level: <int>; folder search level depth
     :param excludes: <regex string>|<list>
+    :param walk_stats: <WalkStats>; record listings and pruned directories
+    :param cycles: <string>; symlink cycle policy; see scandir_walk
     :returns: <generator>; dirpath, dirnames, filenames
     """
 
-    # Compile re expression
+    walk_gen = scandir_walk(top, topdown, onerror, followlinks, level,
+                            excludes, walk_stats=walk_stats, cycles=cycles)
+    for dirpath, dir_entries, file_entries in walk_gen:
+        dirnames = [e.name for e in dir_entries]
+
+        # yield result
+        yield dirpath, dirnames, [e.name for e in file_entries]
+
+        # pass in place modifications of dirnames on to the walk
+        if topdown:
+            entries = dict((e.name, e) for e in dir_entries)
+            dir_entries[:] = [entries.get(d, d) for d in dirnames]
+
+
+def parallel_walk2(top, workers=8, ordered=True, onerror=None,
+                   followlinks=False, level=False, excludes=None,
+                   walk_stats=None, cycles=None):
+    """
+    walk2 listing the directories concurrently on a thread pool.
+
+    Meant for high latency filesystems where each listing takes long.
+    The caller thread hands the directories to the pool in walk order, at
+    most PREFETCH listings per worker are running or done but not yet
+    yielded, so memory stays bounded however far the caller lags behind.
+    dirnames can not be pruned in place; use level and excludes instead.
+    The walk is always topdown.
+
+    :param top: <string>; see os.walk
+    :param workers: <int>; number of listing threads
+    :param ordered: <boolean>; yield in walk2 order, else as completed
+    :param onerror: <function>; see os.walk, called from the caller thread
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :param walk_stats: <WalkStats>; record listings and pruned directories,
+                       updated from the caller thread
+    :param cycles: <string>; symlink cycle policy; see scandir_walk
+    :returns: <generator>; dirpath, dirnames, filenames
+    """
+
+    is_excluded = _get_exclude_test(excludes)
+    top = _check_top(top, level)
+    guard = None
+    if cycles is not None:
+        guard = _CycleGuard(cycles, top, walk_stats=walk_stats)
+        if followlinks:
+            top = guard.top
+        else:
+            guard = None
+    executor = futures.ThreadPoolExecutor(max_workers=workers)
+    window = max(1, workers * PREFETCH)
+
+    def list_dir(dirpath, depth):
+        """
+        List one directory in a pool thread.
+
+        :return: dirpath, dirnames, filenames, (child dirpath, depth) tuples,
+                 errors, stats values
+        """
+        errors = []
+        start = time.perf_counter() if walk_stats is not None else 0
+        listing = _scan_dir(dirpath, errors.append)
+        if listing is None:
+            return dirpath, None, None, [], errors, None
+        dir_entries, file_entries = listing
+        values = None
+        if walk_stats is not None:
+            values = [time.perf_counter() - start, len(dir_entries),
+                      len(file_entries), 0, 0]
+
+        if is_excluded is not None:
+            count = len(dir_entries)
+            dir_entries = [e for e in dir_entries if not is_excluded(e.name)]
+            if values is not None:
+                values[3] = count - len(dir_entries)
+
+        children = []
+        if not (level and depth >= level):
+            for entry in dir_entries:
+                if followlinks or not _is_symlink(entry):
+                    new_path = entry.path
+                    if guard is not None:
+                        new_path = guard.visit(entry, new_path, errors.append)
+                        if new_path is None:
+                            continue
+                    children.append((new_path, depth + 1))
+        elif values is not None:
+            values[4] = len(dir_entries)
+
+        return (dirpath, [e.name for e in dir_entries],
+                [e.name for e in file_entries], children, errors, values)
+
+    def get_result(future):
+        """
+        Report the errors and stats of a listing.
+
+        :return: listing result or None if the listing failed
+        """
+        result = future.result()
+        errors, values = result[4:]
+        if onerror is not None:
+            for err in errors:
+                onerror(err)
+        if walk_stats is not None:
+            if values is None:
+                walk_stats.errors += 1
+            else:
+                walk_stats.add_listing(result[0], *values[:3])
+                walk_stats.dirs_excluded += values[3]
+                walk_stats.dirs_level_pruned += values[4]
+        if result[1] is None:
+            return None
+        return result
+
     try:
-        re_excludes = re.compile(excludes)
-    except TypeError:
-        pass
+        if ordered:
+            # walk2 stack of [dirpath, depth, future], the directories
+            # yielded next are submitted first
+            stack = [[top, 0, None]]
+            submitted = 0
+            while stack:
+                index = len(stack) - 1
+                while submitted < window and index >= 0:
+                    item = stack[index]
+                    if item[2] is None:
+                        item[2] = executor.submit(list_dir, item[0], item[1])
+                        submitted += 1
+                    index -= 1
 
-    # level
-    if level:
-        top = top.rstrip(os.path.sep)
-        assert os.path.isdir(top)
-        num_sep = top.count(os.path.sep)
+                future = stack.pop()[2]
+                submitted -= 1
+                result = get_result(future)
+                if result is None:
+                    continue
 
-    # loop through os.walk
-    for dirpath, dirnames, filenames in os.walk(top, topdown, onerror, followlinks):
-        # modify dirnames in place
-        try:
-            dirnames[:] = [d for d in dirnames if d not in excludes]
-            dirnames[:] = [d for d in dirnames if not re_excludes.match(d)]
-        except (UnboundLocalError, TypeError, ValueError, AttributeError):
-            pass
+                # yield result
+                yield result[:3]
 
-        # yield result
-        yield dirpath, dirnames, filenames
+                stack.extend([dirpath, depth, None]
+                             for dirpath, depth in reversed(result[3]))
+        else:
+            pending = [(top, 0)]
+            running = set()
+            while pending or running:
+                while pending and len(running) < window:
+                    running.add(executor.submit(list_dir, *pending.pop()))
+                done, running = futures.wait(
+                    running, return_when=futures.FIRST_COMPLETED)
 
-        # level
-        if level:
-            num_sep_current = dirpath.count(os.path.sep)
-            if num_sep + level <= num_sep_current:
-                del dirnames[:]
+                for future in done:
+                    result = get_result(future)
+                    if result is None:
+                        continue
+
+                    # yield result
+                    yield result[:3]
+
+                    pending.extend(result[3])
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def scan_folder(path, search_pattern, followlinks=False, level=False,
-                excludes=None):
+                excludes=None, workers=None, ordered=True, walk_stats=None,
+                cycles=None):
     """
     Scan a given root folder and yield all found files
 
@@ -87,6 +632,12 @@ def scan_folder(path, search_pattern, followlinks=False, level=False,
     :param followlinks: <boolean>; see os.walk
     :param level: <int>; folder search level depth
     :param excludes: <regex string>|<list>
+    :param workers: <int>; list directories on a thread pool; see
+                    parallel_walk2
+    :param ordered: <boolean>; with workers, yield in walk2 order
+    :param walk_stats: <WalkStats>; record listings, pruned directories,
+                       regex evaluations and matches
+    :param cycles: <string>; symlink cycle policy; see scandir_walk
     :return: <generator>; found files else <boolean> False
     """
 
@@ -102,9 +653,201 @@ def scan_folder(path, search_pattern, followlinks=False, level=False,
 
     # Do the scan
     path = os.path.normpath(path)
-    walk_gen = walk2(path, followlinks=followlinks, level=level, excludes=excludes)
+    if workers:
+        walk_gen = parallel_walk2(path, workers, ordered,
+                                  followlinks=followlinks, level=level,
+                                  excludes=excludes, walk_stats=walk_stats,
+                                  cycles=cycles)
+    else:
+        walk_gen = walk2(path, followlinks=followlinks, level=level,
+                         excludes=excludes, walk_stats=walk_stats,
+                         cycles=cycles)
     for dirpath, dirnames, filenames in walk_gen:
         if filenames:
+            if walk_stats is not None:
+                walk_stats.regex_evals += len(filenames)
             for filename in filenames:
                 if re_search.search(filename):
+                    if walk_stats is not None:
+                        walk_stats.matches += 1
                     yield dirpath, filename
+
+
+# Literal file name suffix pattern e.g. \.exr$
+_RE_LITERAL_SUFFIX = re.compile(r'((?:\\[^0-9A-Za-z]|[0-9A-Za-z_ -])+)'
+                                r'(?:\$|\\Z)\Z')
+
+
+def _get_classifier(patterns, walk_stats=None):
+    """
+    Build a function returning the labels of all patterns a file name
+    matches, case insensitive and in the order of the patterns.
+
+    Literal suffix patterns e.g. \\.exr$ are tested with an extension dict
+    or str.endswith, all others with one combined regex first, so files that
+    match nothing cost a single regex search.
+
+    :param patterns: <dict>; label: regex string
+    :param walk_stats: <WalkStats>; count the regex searches
+    :return: <function>; filename -> labels
+    """
+
+    if not isinstance(patterns, dict):
+        raise TypeError('Expected dict of label: regex string')
+
+    extensions = {}
+    suffixes = []
+    regexes = []
+    for index, (label, pattern) in enumerate(patterns.items()):
+        try:
+            match = _RE_LITERAL_SUFFIX.match(pattern)
+        except TypeError:
+            raise TypeError('Expected regex search string')
+        if match is None:
+            regexes.append((index, label, re.compile(pattern, re.IGNORECASE)))
+            continue
+        suffix = match.group(1).replace('\\', '').lower()
+        if suffix.startswith('.') and '.' not in suffix[1:]:
+            extensions.setdefault(suffix, []).append((index, label))
+        else:
+            suffixes.append((index, label, suffix))
+
+    # one search to reject files matching none of the regexes; patterns with
+    # groups are not combined as their group numbers would change, patterns
+    # with global inline flags e.g. (?i) can not be combined at all
+    re_any = None
+    if len(regexes) > 1 and not any(r[2].groups for r in regexes):
+        try:
+            re_any = re.compile('|'.join('(?:{})'.format(r[2].pattern)
+                                         for r in regexes), re.IGNORECASE)
+        except re.error:
+            re_any = None
+
+    def classify(filename):
+        found = []
+        if extensions or suffixes:
+            lower = filename.lower()
+            dot = lower.rfind('.')
+            if dot != -1 and extensions:
+                found.extend(extensions.get(lower[dot:], ()))
+            for index, label, suffix in suffixes:
+                if lower.endswith(suffix):
+                    found.append((index, label))
+        if regexes:
+            if re_any is None:
+                matched = True
+            else:
+                if walk_stats is not None:
+                    walk_stats.regex_evals += 1
+                matched = re_any.search(filename) is not None
+            if matched:
+                if walk_stats is not None:
+                    walk_stats.regex_evals += len(regexes)
+                for index, label, regex in regexes:
+                    if regex.search(filename):
+                        found.append((index, label))
+        if len(found) > 1:
+            found.sort(key=lambda item: item[0])
+        return [label for index, label in found]
+
+    return classify
+
+
+def scan_folder_multi(path, patterns, followlinks=False, level=False,
+                      excludes=None, workers=None, ordered=True,
+                      walk_stats=None, cycles=None):
+    """
+    Scan a given root folder once for several search patterns
+
+    :param path: <string>; search root path
+    :param patterns: <dict>; label: regex string e.g. {'exr': r'\\.exr$'}
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :param workers: <int>; list directories on a thread pool; see
+                    parallel_walk2
+    :param ordered: <boolean>; with workers, yield in walk2 order
+    :param walk_stats: <WalkStats>; record listings, pruned directories,
+                       regex evaluations and matches
+    :param cycles: <string>; symlink cycle policy; see scandir_walk
+    :return: <generator>; label, dirpath, filename of found files, a file
+             matching several patterns is yielded once per label
+    """
+
+    classify = _get_classifier(patterns, walk_stats)
+
+    # Check the path
+    if not os.path.isdir(path):
+        raise OSError('Path does not exist')
+
+    # Do the scan
+    path = os.path.normpath(path)
+    if workers:
+        walk_gen = parallel_walk2(path, workers, ordered,
+                                  followlinks=followlinks, level=level,
+                                  excludes=excludes, walk_stats=walk_stats,
+                                  cycles=cycles)
+    else:
+        walk_gen = walk2(path, followlinks=followlinks, level=level,
+                         excludes=excludes, walk_stats=walk_stats,
+                         cycles=cycles)
+    for dirpath, dirnames, filenames in walk_gen:
+        for filename in filenames:
+            for label in classify(filename):
+                if walk_stats is not None:
+                    walk_stats.matches += 1
+                yield label, dirpath, filename
+
+
+def scan_folder_stats(path, search_pattern, followlinks=False, level=False,
+                      excludes=None, walk_stats=None, cycles=None):
+    """
+    Scan a given root folder and yield all found files with their stat values
+
+    The values are read through the os.DirEntry of the walk: the inode comes
+    with the listing and where the platform does not deliver the size with
+    it, only the found files are stat'ed, once and without a path lookup.
+    Broken symlinks get the values of the link itself.
+
+    :param path: <string>; search root path
+    :param search_pattern: <regex string>
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :param walk_stats: <WalkStats>; record listings, pruned directories,
+                       regex evaluations and matches
+    :param cycles: <string>; symlink cycle policy; see scandir_walk
+    :return: <generator>; dirpath, filename, size, mtime, inode
+    """
+
+    # Compile search pattern regex
+    try:
+        re_search = re.compile(search_pattern, re.IGNORECASE)
+    except TypeError:
+        raise TypeError('Expected regex search string')
+
+    # Check the path
+    if not os.path.isdir(path):
+        raise OSError('Path does not exist')
+
+    # Do the scan
+    path = os.path.normpath(path)
+    walk_gen = scandir_walk(path, followlinks=followlinks, level=level,
+                            excludes=excludes, walk_stats=walk_stats,
+                            cycles=cycles)
+    for dirpath, dir_entries, file_entries in walk_gen:
+        if walk_stats is not None:
+            walk_stats.regex_evals += len(file_entries)
+        for entry in file_entries:
+            if not re_search.search(entry.name):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+            if walk_stats is not None:
+                walk_stats.matches += 1
+            yield dirpath, entry.name, st.st_size, st.st_mtime, st.st_ino
@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=process_scan.py
+
+os_path.scan_folder over many roots on a process pool.
+Each root, or each top-level sub folder of a root, is scanned by one worker
+process. The workers send their hits in batches through one queue and the
+caller gets them merged into a single iterator. A failing root is reported
+and does not stop the others. Optionally the workers parse every hit with
+imagepath, so parsing is spread over the processes as well.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import multiprocessing
+import os
+import queue
+import re
+from concurrent import futures
+
+from . import imagepath
+from . import os_path
+
+
+# Number of hits a worker sends per message
+BATCH_SIZE = 1000
+
+# Seconds between checks for crashed workers while waiting for messages
+_POLL_TIMEOUT = 0.1
+
+# Result queue of a worker process, set by _init_worker
+_QUEUE = None
+
+
+def _init_worker(result_queue):
+    """
+    Process pool initializer passing the result queue to the worker.
+    """
+
+    global _QUEUE
+    _QUEUE = result_queue
+    # all messages of a task are read before its done message, do not keep
+    # the worker alive for the rest if the caller stopped reading
+    result_queue.cancel_join_thread()
+
+
+def _pack_error(err):
+    """
+    Reduce an exception to picklable values.
+    """
+
+    if isinstance(err, OSError):
+        return ('OSError', err.errno, err.strerror or str(err), err.filename)
+    return (type(err).__name__, None, str(err), None)
+
+
+def _unpack_error(values):
+    """
+    Rebuild an exception of _pack_error values.
+    """
+
+    name, err_no, message, filename = values
+    if name == 'OSError':
+        if err_no is None:
+            return OSError(message)
+        return OSError(err_no, message, filename)
+    return RuntimeError('{}: {}'.format(name, message))
+
+
+def _scan_task(task_id, path, search_pattern, followlinks, level, excludes,
+               parse, major_minor, batch_size):
+    """
+    Scan one folder in a worker process and stream the hits.
+
+    Sends (task_id, hits, errors, done) messages; hits are
+    (dirpath, filename) or (dirpath, filename, image_dict) tuples.
+    """
+
+    hits = []
+    errors = []
+    try:
+        re_search = re.compile(search_pattern, re.IGNORECASE)
+        if not os.path.isdir(path):
+            raise OSError('Path does not exist: {}'.format(path))
+        walk_gen = os_path.walk2(os.path.normpath(path),
+                                 onerror=errors.append,
+                                 followlinks=followlinks, level=level,
+                                 excludes=excludes)
+        for dirpath, dirnames, filenames in walk_gen:
+            for filename in filenames:
+                if not re_search.search(filename):
+                    continue
+                if parse:
+                    image_dict = imagepath.Image(os.path.join(
+                        dirpath, filename)).get_image_values(major_minor)
+                    hits.append((dirpath, filename, image_dict))
+                else:
+                    hits.append((dirpath, filename))
+            if len(hits) >= batch_size or errors:
+                _QUEUE.put((task_id, hits, [_pack_error(e) for e in errors],
+                            False))
+                hits = []
+                errors = []
+    except Exception as err:
+        errors.append(err)
+    _QUEUE.put((task_id, hits, [_pack_error(e) for e in errors], True))
+
+
+def _raise(err):
+    raise err
+
+
+def _get_tasks(root, search_pattern, split, followlinks, level, excludes):
+    """
+    Split a root into scan tasks.
+
+    With split, every walked top-level sub folder is a task and the files of
+    the root itself are matched right away.
+
+    :return: <tuple>; task paths and levels, root hits
+    """
+
+    if not split or level == 1:
+        return [(root, level)], []
+
+    re_search = re.compile(search_pattern, re.IGNORECASE)
+    is_excluded = os_path._get_exclude_test(excludes)
+    listing = os_path._scan_dir(os.path.normpath(root), _raise)
+    if listing is None:
+        return [], []
+    dir_entries, file_entries = listing
+
+    hits = [(os.path.normpath(root), e.name) for e in file_entries
+            if re_search.search(e.name)]
+    tasks = []
+    for entry in dir_entries:
+        if is_excluded is not None and is_excluded(entry.name):
+            continue
+        if not followlinks and os_path._is_symlink(entry):
+            continue
+        tasks.append((entry.path, level - 1 if level else level))
+    return tasks, hits
+
+
+def scan_roots(roots, search_pattern, processes=None, split=False,
+               parse=False, major_minor=False, onerror=None,
+               followlinks=False, level=False, excludes=None,
+               batch_size=BATCH_SIZE, mp_context=None):
+    """
+    Scan many root folders on a process pool, like os_path.scan_folder.
+
+    Hits are yielded as the worker batches arrive, the hits of one task keep
+    their walk2 order. Errors of a root, e.g. a missing root or a listing
+    error below it, are passed to onerror and do not stop the other roots.
+    If the iteration is stopped early, already running tasks finish in the
+    background.
+
+    :param roots: <list>; search root paths
+    :param search_pattern: <regex string>
+    :param processes: <int>; number of worker processes, cpu count if None
+    :param split: <boolean>; scan the top-level sub folders of each root as
+                  separate tasks, for roots with a few large subtrees
+    :param parse: <boolean>; add the imagepath.Image.get_image_values dict
+                  of each hit, computed in the worker
+    :param major_minor: <boolean>; version style of parse
+    :param onerror: <function>; called with root, exception
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth of each root
+    :param excludes: <regex string>|<list>
+    :param batch_size: <int>; hits per worker message
+    :param mp_context: <multiprocessing context>; default context if None
+    :return: <generator>; root, dirpath, filename and with parse image_dict
+    """
+
+    # Compile search pattern regex
+    try:
+        re.compile(search_pattern, re.IGNORECASE)
+    except TypeError:
+        raise TypeError('Expected regex search string')
+
+    def report(root, err):
+        if onerror is not None:
+            onerror(root, err)
+
+    if mp_context is None:
+        mp_context = multiprocessing.get_context()
+    result_queue = mp_context.Queue()
+    executor = futures.ProcessPoolExecutor(
+        max_workers=processes, mp_context=mp_context,
+        initializer=_init_worker, initargs=(result_queue,))
+
+    task_roots = {}
+    running = {}
+    try:
+        for root in roots:
+            try:
+                tasks, hits = _get_tasks(root, search_pattern, split,
+                                         followlinks, level, excludes)
+            except OSError as err:
+                report(root, err)
+                continue
+            for dirpath, filename in hits:
+                if parse:
+                    image_dict = imagepath.Image(os.path.join(
+                        dirpath, filename)).get_image_values(major_minor)
+                    yield root, dirpath, filename, image_dict
+                else:
+                    yield root, dirpath, filename
+
+            for path, task_level in tasks:
+                task_id = len(task_roots)
+                task_roots[task_id] = root
+                running[task_id] = executor.submit(
+                    _scan_task, task_id, path, search_pattern, followlinks,
+                    task_level, excludes, parse, major_minor, batch_size)
+
+        while running:
+            try:
+                task_id, hits, errors, done = result_queue.get(
+                    timeout=_POLL_TIMEOUT)
+            except queue.Empty:
+                # a crashed worker never sends its done message
+                for task_id, future in list(running.items()):
+                    if future.done() and future.exception() is not None:
+                        del running[task_id]
+                        report(task_roots[task_id], future.exception())
+                continue
+
+            root = task_roots[task_id]
+            for values in errors:
+                report(root, _unpack_error(values))
+            for hit in hits:
+                yield (root,) + hit
+            if done:
+                running.pop(task_id, None)
+    finally:
+        # running tasks can not be cancelled, do not wait for them if the
+        # caller stopped early
+        executor.shutdown(wait=not running, cancel_futures=True)
+        result_queue.close()
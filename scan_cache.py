@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=scan_cache.py
+
+Persistent directory listing cache for repeated scans of the same roots.
+Each directory is stored with its device, inode and mtime. On a rescan only
+directories whose stat changed are listed again, all others are served from
+the cache. The cache is a SQLite file, so it can be shared between processes.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import os
+import re
+import sqlite3
+import time
+
+from . import os_path
+
+
+# A directory changed within this time before its listing may change again
+# without a visible mtime change, it is listed again on the next scan
+RACY_NS = 2 * 10**9
+# Number of directory updates written per transaction
+BATCH_SIZE = 1000
+# Name separator of the stored listings, not allowed in file names
+SEP = '\0'
+# Paths and listings are stored as os.fsencode bytes, names that are not
+# valid UTF-8 can not be bound as TEXT
+
+
+class ScanCache(object):
+    """
+    Directory listing cache keyed on directory mtimes
+    """
+
+    def __init__(self, cache_file, max_dirs=1000000, timeout=60):
+        """
+        Init the cache.
+
+        :params cache_file: path of the SQLite cache file on local disk
+        :type cache_file: str
+        :params max_dirs: max number of cached directories, the least
+                          recently used ones are evicted after each scan
+        :type max_dirs: int
+        :params timeout: seconds to wait for a lock held by another process
+        :type timeout: float
+        """
+        self.cache_file = cache_file
+        self.max_dirs = max_dirs
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+        # private vars
+        self._db = sqlite3.connect(cache_file, timeout=timeout)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS dirs ('
+                             'path BLOB PRIMARY KEY, dev INTEGER, '
+                             'ino INTEGER, mtime_ns INTEGER, '
+                             'listed_ns INTEGER, used_ns INTEGER, '
+                             'dirnames BLOB, links BLOB, filenames BLOB)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS dirs_used '
+                             'ON dirs (used_ns)')
+        self._updates = []
+        self._used = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Write pending updates and close the cache file.
+        """
+
+        self.flush()
+        self._db.close()
+
+    def clear(self):
+        """
+        Remove all cached directories.
+        """
+
+        self._updates = []
+        self._used = []
+        with self._db:
+            self._db.execute('DELETE FROM dirs')
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM dirs').fetchone()[0]
+
+    def flush(self):
+        """
+        Write pending directory updates in one transaction.
+        """
+
+        if not self._updates and not self._used:
+            return
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO dirs VALUES '
+                                 '(?, ?, ?, ?, ?, ?, ?, ?, ?)', self._updates)
+            self._db.executemany('UPDATE dirs SET used_ns = ? WHERE path = ?',
+                                 self._used)
+        self._updates = []
+        self._used = []
+
+    def evict(self):
+        """
+        Drop the least recently used directories above max_dirs.
+
+        :return: number of evicted directories
+        :rtype: int
+        """
+
+        self.flush()
+        surplus = len(self) - self.max_dirs
+        if surplus <= 0:
+            return 0
+        with self._db:
+            self._db.execute('DELETE FROM dirs WHERE path IN '
+                             '(SELECT path FROM dirs ORDER BY used_ns '
+                             'LIMIT ?)', (surplus,))
+        self.stats['evictions'] += surplus
+        return surplus
+
+    def _queue(self, rows, row):
+        """
+        Queue a write and flush full batches.
+        """
+
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self.flush()
+
+    def list_dir(self, dirpath, onerror=None):
+        """
+        List a directory, from the cache if it did not change.
+
+        :params dirpath: directory to list
+        :type dirpath: str
+        :params onerror: see os.walk
+        :type onerror: function
+        :return: dirnames, symlinked dirnames, filenames
+                 or None if the listing failed
+        :rtype: tuple(list)
+        """
+
+        try:
+            st = os.stat(dirpath)
+        except OSError as err:
+            if onerror is not None:
+                onerror(err)
+            return None
+
+        now_ns = time.time_ns()
+        key = os.fsencode(dirpath)
+        row = self._db.execute('SELECT dev, ino, mtime_ns, listed_ns, '
+                               'dirnames, links, filenames FROM dirs '
+                               'WHERE path = ?', (key,)).fetchone()
+        if (row is not None and
+                row[:3] == (st.st_dev, st.st_ino, st.st_mtime_ns) and
+                row[2] < row[3] - RACY_NS):
+            self.stats['hits'] += 1
+            self._queue(self._used, (now_ns, key))
+            return tuple(os.fsdecode(names).split(SEP) if names else []
+                         for names in row[4:])
+
+        self.stats['misses'] += 1
+        listing = os_path._scan_dir(dirpath, onerror)
+        if listing is None:
+            return None
+        dir_entries, file_entries = listing
+        dirnames = [e.name for e in dir_entries]
+        links = [e.name for e in dir_entries if os_path._is_symlink(e)]
+        filenames = [e.name for e in file_entries]
+
+        self._queue(self._updates,
+                    (key, st.st_dev, st.st_ino, st.st_mtime_ns, now_ns,
+                     now_ns, os.fsencode(SEP.join(dirnames)),
+                     os.fsencode(SEP.join(links)),
+                     os.fsencode(SEP.join(filenames))))
+        return dirnames, links, filenames
+
+    def walk2(self, top, onerror=None, followlinks=False, level=False,
+              excludes=None):
+        """
+        Cached os_path.walk2, always topdown.
+
+        Every directory costs one stat; only changed directories are listed.
+        dirnames can be modified in place to prune the walk.
+
+        :param top: <string>; see os.walk
+        :param onerror: <function>; see os.walk
+        :param followlinks: <boolean>; see os.walk
+        :param level: <int>; folder search level depth
+        :param excludes: <regex string>|<list>
+        :returns: <generator>; dirpath, dirnames, filenames
+        """
+
+        is_excluded = os_path._get_exclude_test(excludes)
+        top = os_path._check_top(top, level)
+
+        stack = [(top, 0)]
+        try:
+            while stack:
+                dirpath, depth = stack.pop()
+                listing = self.list_dir(dirpath, onerror)
+                if listing is None:
+                    continue
+                dirnames, links, filenames = listing
+
+                # modify dirnames in place
+                if is_excluded is not None:
+                    dirnames = [d for d in dirnames if not is_excluded(d)]
+
+                # yield result
+                yield dirpath, dirnames, filenames
+
+                # level
+                if level and depth >= level:
+                    continue
+
+                known = set(listing[0])
+                links = set(links)
+                for dirname in reversed(dirnames):
+                    new_path = os.path.join(dirpath, dirname)
+                    if not followlinks:
+                        if dirname in known:
+                            if dirname in links:
+                                continue
+                        elif os.path.islink(new_path):
+                            continue
+                    stack.append((new_path, depth + 1))
+        finally:
+            self.evict()
+
+    def scan_folder(self, path, search_pattern, followlinks=False,
+                    level=False, excludes=None):
+        """
+        Cached os_path.scan_folder.
+
+        The cache stores the full listings, so one cache serves scans with
+        different search patterns.
+
+        :param path: <string>; search root path
+        :param search_pattern: <regex string>
+        :param followlinks: <boolean>; see os.walk
+        :param level: <int>; folder search level depth
+        :param excludes: <regex string>|<list>
+        :return: <generator>; found files
+        """
+
+        # Compile search pattern regex
+        try:
+            re_search = re.compile(search_pattern, re.IGNORECASE)
+        except TypeError:
+            raise TypeError('Expected regex search string')
+
+        # Check the path
+        if not os.path.isdir(path):
+            raise OSError('Path does not exist')
+
+        # Do the scan
+        path = os.path.normpath(path)
+        walk_gen = self.walk2(path, followlinks=followlinks, level=level,
+                              excludes=excludes)
+        for dirpath, dirnames, filenames in walk_gen:
+            for filename in filenames:
+                if re_search.search(filename):
+                    yield dirpath, filename
@@ -0,0 +1,837 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=sequence.py
+
+Collapse image files into frame sequences and renumber them.
+The frame parts of each file are parsed by imagepath.Image, the scan builds
+on top of os_path.scan_folder and emits the sequences directory by directory.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# MODULES
+import bisect
+import itertools
+import os
+import re
+from concurrent import futures
+
+from . import imagepath
+from . import os_path
+
+
+def get_frame_ranges(frames):
+    """
+    Run length encode frame numbers.
+
+    :param frames: <iterable>; frame numbers
+    :return: <list>; (first, last) tuples of consecutive frames
+    """
+
+    ranges = []
+    for frame in sorted(set(frames)):
+        if ranges and ranges[-1][1] + 1 == frame:
+            ranges[-1] = (ranges[-1][0], frame)
+        else:
+            ranges.append((frame, frame))
+    return ranges
+
+
+class FrameSequence(object):
+    """
+    Compact frame sequence of one directory
+
+    A file without a frame number is kept as a sequence without frames.
+    """
+
+    __slots__ = ('path', 'name', 'frame_prefix', 'padding', 'ext', 'ranges')
+
+    def __init__(self, path, name, frame_prefix=None, padding=None, ext='',
+                 ranges=None):
+        """
+        Init the sequence.
+
+        :params path: sequence directory
+        :type path: str
+        :params name: image base name
+        :type name: str
+        :params frame_prefix: character before the frame e.g. .
+        :type frame_prefix: str
+        :params padding: frame digit padding
+        :type padding: int
+        :params ext: image extension
+        :type ext: str
+        :params ranges: (first, last) tuples of consecutive frames
+        :type ranges: list(tuple(int))
+        """
+        self.path = path
+        self.name = name or ''
+        self.frame_prefix = frame_prefix or ''
+        self.padding = padding
+        self.ext = ext
+        self.ranges = ranges or []
+
+    @classmethod
+    def from_frames(cls, path, name, frame_prefix, padding, ext, frames):
+        """
+        Create a sequence from single frame numbers.
+
+        :params frames: frame numbers
+        :type frames: iterable(int)
+        :return: sequence
+        :rtype: FrameSequence
+        """
+        return cls(path, name, frame_prefix, padding, ext,
+                   get_frame_ranges(frames))
+
+    def __len__(self):
+        return sum(last - first + 1 for first, last in self.ranges)
+
+    def __iter__(self):
+        for first, last in self.ranges:
+            for frame in range(first, last + 1):
+                yield frame
+
+    def __contains__(self, frame):
+        for first, last in self.ranges:
+            if first <= frame <= last:
+                return True
+        return False
+
+    def __eq__(self, other):
+        if not isinstance(other, FrameSequence):
+            return NotImplemented
+        return (self.path, self.get_pattern(), self.ranges) == \
+               (other.path, other.get_pattern(), other.ranges)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash((self.path, self.get_pattern(), tuple(self.ranges)))
+
+    def __str__(self):
+        if not self.ranges:
+            return self.get_pattern()
+        return '{} {}'.format(self.get_pattern(), self.get_frame_range())
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(self.__class__.__name__,
+                                       os.path.join(self.path,
+                                                    self.get_pattern()),
+                                       self.get_frame_range())
+
+    def get_pattern(self, notation=False):
+        """
+        Get the sequence file name with the frame as hash or notation.
+
+        :params notation: use %0Nd instead of the frame hash
+        :type notation: bool
+        :return: e.g. shot.####.exr
+        :rtype: str
+        """
+
+        if not self.padding:
+            return self.name + self.frame_prefix + self.ext
+        if notation:
+            frame = '%0' + str(self.padding) + 'd'
+        else:
+            frame = '#' * self.padding
+        return self.name + self.frame_prefix + frame + self.ext
+
+    def get_frame_range(self):
+        """
+        Get the frame ranges as string.
+
+        :return: e.g. 1001-1100,1102-1200
+        :rtype: str
+        """
+
+        ranges = []
+        for first, last in self.ranges:
+            if first == last:
+                ranges.append(str(first))
+            else:
+                ranges.append('{}-{}'.format(first, last))
+        return ','.join(ranges)
+
+    def get_frame_path(self, frame):
+        """
+        Get the full path of a single frame.
+
+        :params frame: frame number
+        :type frame: int
+        :return: image
+        :rtype: str
+        """
+
+        if not self.padding:
+            return os.path.join(self.path, self.get_pattern())
+        frame = '%0{}d'.format(self.padding) % frame
+        return os.path.join(self.path,
+                            self.name + self.frame_prefix + frame + self.ext)
+
+
+def _get_paddings(frames):
+    """
+    Get the sequence padding of each frame of one name, prefix and ext.
+
+    A zero padded frame e.g. 0001 belongs to the sequence of its width. A
+    frame without leading zero is as wide as the padding or wider, it belongs
+    to the widest padded sequence not wider than itself e.g. 10000 to ####,
+    else to one sequence padded to the shortest of these frames e.g. 1 to 11.
+
+    :param frames: <list>; frame strings
+    :return: <list>; padding per frame
+    """
+
+    padded = sorted(set(len(frame) for frame in frames
+                        if len(frame) > 1 and frame[0] == '0'))
+    paddings = []
+    unpadded = None
+    for frame in frames:
+        width = len(frame)
+        if width > 1 and frame[0] == '0':
+            paddings.append(width)
+            continue
+        index = bisect.bisect_right(padded, width)
+        if index:
+            paddings.append(padded[index - 1])
+        else:
+            paddings.append(None)
+            if unpadded is None or width < unpadded:
+                unpadded = width
+    return [unpadded if padding is None else padding for padding in paddings]
+
+
+def collapse(dirpath, filenames):
+    """
+    Group the files of one directory into frame sequences.
+
+    Frames without leading zero join a padded sequence if they are wider
+    than the padding e.g. shot.10000.exr belongs to shot.####.exr and
+    shot.1.exr to shot.11.exr; see _get_paddings.
+
+    :param dirpath: <string>; directory of the files
+    :param filenames: <iterable>; file names
+    :return: <list>; FrameSequence objects sorted by pattern
+    """
+
+    groups = {}
+    singles = []
+    for filename in filenames:
+        image = imagepath.Image(filename)
+        frame_dict = image.get_frame()
+        if not frame_dict['frame_digit']:
+            singles.append(FrameSequence(dirpath, image.name, ext=image.ext))
+            continue
+        key = (image.get_b_name(), frame_dict['frame_prefix'], image.ext)
+        groups.setdefault(key, []).append(frame_dict['frame'])
+
+    sequences = {}
+    for (name, frame_prefix, ext), frames in groups.items():
+        for frame, padding in zip(frames, _get_paddings(frames)):
+            key = (name, frame_prefix, padding, ext)
+            sequences.setdefault(key, []).append(int(frame))
+
+    result = [FrameSequence.from_frames(dirpath, name, frame_prefix, padding,
+                                        ext, frames)
+              for (name, frame_prefix, padding, ext), frames
+              in sequences.items()]
+    result.extend(singles)
+    result.sort(key=lambda sequence: sequence.get_pattern())
+    return result
+
+
+def scan_sequences(path, search_pattern, followlinks=False, level=False,
+                   excludes=None):
+    """
+    Scan a given root folder and yield the found files as frame sequences.
+
+    The sequences are yielded per directory while walking, so only the files
+    of one directory are held in memory.
+
+    :param path: <string>; search root path
+    :param search_pattern: <regex string>
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :return: <generator>; FrameSequence objects
+    """
+
+    scan_gen = os_path.scan_folder(path, search_pattern,
+                                   followlinks=followlinks, level=level,
+                                   excludes=excludes)
+    for dirpath, found in itertools.groupby(scan_gen, lambda hit: hit[0]):
+        for sequence in collapse(dirpath, (hit[1] for hit in found)):
+            yield sequence
+
+
+class Usage(object):
+    """
+    File count, total bytes and oldest, newest mtime of a group of files
+    """
+
+    __slots__ = ('files', 'size', 'oldest', 'newest')
+
+    def __init__(self):
+        self.files = 0
+        self.size = 0
+        self.oldest = None
+        self.newest = None
+
+    def __repr__(self):
+        return 'Usage(files={}, size={}, oldest={}, newest={})'.format(
+            self.files, self.size, self.oldest, self.newest)
+
+    def add(self, size, mtime):
+        """
+        Add one file.
+
+        :params size: file size in bytes
+        :type size: int
+        :params mtime: file modification time
+        :type mtime: float
+        """
+
+        self.files += 1
+        self.size += size
+        if self.oldest is None or mtime < self.oldest:
+            self.oldest = mtime
+        if self.newest is None or mtime > self.newest:
+            self.newest = mtime
+
+    def update(self, other):
+        """
+        Add the files of another usage e.g. to sum up directories.
+
+        :params other: usage to add
+        :type other: Usage
+        """
+
+        if not other.files:
+            return
+        self.files += other.files
+        self.size += other.size
+        if self.oldest is None or other.oldest < self.oldest:
+            self.oldest = other.oldest
+        if self.newest is None or other.newest > self.newest:
+            self.newest = other.newest
+
+
+def scan_usage(path, search_pattern, followlinks=False, level=False,
+               excludes=None):
+    """
+    Scan a given root folder and yield the disk usage per directory and
+    frame sequence.
+
+    The size and mtime come from os_path.scan_folder_stats, so no file is
+    stat'ed twice. Each directory is yielded as soon as it is scanned.
+
+    :param path: <string>; search root path
+    :param search_pattern: <regex string>
+    :param followlinks: <boolean>; see os.walk
+    :param level: <int>; folder search level depth
+    :param excludes: <regex string>|<list>
+    :return: <generator>; dirpath, directory Usage and a list of
+             (FrameSequence, Usage) sorted by pattern
+    """
+
+    scan_gen = os_path.scan_folder_stats(path, search_pattern,
+                                         followlinks=followlinks,
+                                         level=level, excludes=excludes)
+    for dirpath, found in itertools.groupby(scan_gen, lambda hit: hit[0]):
+        dir_usage = Usage()
+        groups = {}
+        for hit in found:
+            filename, size, mtime = hit[1:4]
+            dir_usage.add(size, mtime)
+            image = imagepath.Image(filename)
+            frame_dict = image.get_frame()
+            if frame_dict['frame_digit']:
+                key = (image.get_b_name(), frame_dict['frame_prefix'],
+                       image.ext)
+                frame = frame_dict['frame']
+            else:
+                key = (image.name, None, image.ext)
+                frame = None
+            groups.setdefault(key, []).append((frame, size, mtime))
+
+        # padding of the frames as in collapse
+        sequences = {}
+        for (name, frame_prefix, ext), files in groups.items():
+            frames = [f[0] for f in files if f[0] is not None]
+            paddings = iter(_get_paddings(frames))
+            for frame, size, mtime in files:
+                padding = None if frame is None else next(paddings)
+                key = (name, frame_prefix, padding, ext)
+                values = sequences.get(key)
+                if values is None:
+                    values = sequences[key] = ([], Usage())
+                if frame is not None:
+                    values[0].append(int(frame))
+                values[1].add(size, mtime)
+
+        result = [(FrameSequence.from_frames(dirpath, *(key + (frames,))),
+                   usage)
+                  for key, (frames, usage) in sequences.items()]
+        result.sort(key=lambda item: item[0].get_pattern())
+        yield dirpath, dir_usage, result
+
+
+class RenamePlan(object):
+    """
+    Ordered renames of a frame sequence renumber
+
+    The renames of one stage are independent of each other and can run in
+    parallel, the stages have to run one after the other.
+    """
+
+    __slots__ = ('stages',)
+
+    def __init__(self, stages=None):
+        """
+        Init the plan.
+
+        :params stages: lists of (source, target) renames
+        :type stages: list(list(tuple))
+        """
+        self.stages = stages or []
+
+    def __len__(self):
+        return sum(len(stage) for stage in self.stages)
+
+    def __iter__(self):
+        for stage in self.stages:
+            for rename in stage:
+                yield rename
+
+    def __str__(self):
+        lines = []
+        for index, stage in enumerate(self.stages):
+            lines.append('# stage {}'.format(index + 1))
+            lines.extend('{} -> {}'.format(source, target)
+                         for source, target in stage)
+        return '\n'.join(lines)
+
+    def execute(self, workers=None):
+        """
+        Run the renames stage by stage.
+
+        :params workers: rename the files of a stage on a thread pool
+        :type workers: int
+        """
+
+        if not workers:
+            for source, target in self:
+                os.rename(source, target)
+            return
+
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for stage in self.stages:
+                for future in [executor.submit(os.rename, source, target)
+                               for source, target in stage]:
+                    future.result()
+
+
+def plan_renumber(frame_sequence, offset=0, mapping=None, padding=None,
+                  two_phase=False):
+    """
+    Plan the renames of a frame sequence renumber.
+
+    All renames are planned up front. Targets already taken by files outside
+    the renamed frames and frames mapped onto the same target raise a
+    ValueError. Renames onto frames that are renamed themselves, e.g. a shift
+    by +1, are ordered so each target is free, cycles are broken with a
+    temporary name. With two_phase all frames are moved to temporary names
+    first, which gives two fully parallel stages.
+
+    :params frame_sequence: sequence to renumber
+    :type frame_sequence: FrameSequence
+    :params offset: added to every frame if no mapping is given
+    :type offset: int
+    :params mapping: {old frame: new frame}; frames not in it are kept
+    :type mapping: dict
+    :params padding: new frame padding, default is the current one
+    :type padding: int
+    :params two_phase: rename via temporary names in two stages
+    :type two_phase: bool
+    :return: renames
+    :rtype: RenamePlan
+    """
+
+    if not frame_sequence.padding:
+        raise ValueError('Sequence \"{}\" has no frames.'.format(
+            frame_sequence.get_pattern()))
+    if mapping is None:
+        mapping = dict((frame, frame + offset) for frame in frame_sequence)
+
+    # Check input values
+    unknown = [frame for frame in mapping if frame not in frame_sequence]
+    if unknown:
+        error_msg = 'Frames {} are not part of \"{}\".'.format(
+            get_frame_ranges(unknown), frame_sequence.get_pattern())
+        raise ValueError(error_msg)
+    if len(set(mapping.values())) != len(mapping):
+        raise ValueError('Several frames are mapped onto the same frame.')
+
+    target_sequence = FrameSequence(frame_sequence.path, frame_sequence.name,
+                                    frame_sequence.frame_prefix,
+                                    padding or frame_sequence.padding,
+                                    frame_sequence.ext)
+    moves = {}
+    for frame, new_frame in mapping.items():
+        source = frame_sequence.get_frame_path(frame)
+        target = target_sequence.get_frame_path(new_frame)
+        if source != target:
+            moves[source] = target
+
+    # Collisions with files that are not renamed
+    existing = set(os.listdir(frame_sequence.path or os.curdir))
+    for target in moves.values():
+        if target not in moves and os.path.basename(target) in existing:
+            error_msg = 'Target \"{}\" already exists.'.format(target)
+            raise ValueError(error_msg)
+
+    def get_temp(path):
+        dirpath, filename = os.path.split(path)
+        temp = os.path.join(dirpath, '.{}.renumber{}'.format(filename,
+                                                             os.getpid()))
+        if os.path.basename(temp) in existing:
+            error_msg = 'Temporary file \"{}\" already exists.'.format(temp)
+            raise ValueError(error_msg)
+        return temp
+
+    if two_phase:
+        temps = dict((source, get_temp(source)) for source in sorted(moves))
+        return RenamePlan([[(source, temps[source]) for source in temps],
+                           [(temps[source], moves[source])
+                            for source in temps]])
+
+    # Chains ending on a free target are renamed from their end
+    sources_of = dict((target, source) for source, target in moves.items())
+    chains = []
+    done = set()
+    for source in sorted(moves):
+        if moves[source] in moves:
+            continue
+        chain = []
+        while source is not None:
+            chain.append((source, moves[source]))
+            done.add(source)
+            source = sources_of.get(source)
+        chains.append(chain)
+
+    # What is left are cycles
+    for source in sorted(moves):
+        if source in done:
+            continue
+        temp = get_temp(source)
+        chain = [(source, temp)]
+        done.add(source)
+        current = sources_of[source]
+        while current != source:
+            chain.append((current, moves[current]))
+            done.add(current)
+            current = sources_of[current]
+        chain.append((temp, moves[source]))
+        chains.append(chain)
+
+    # The n-th renames of all chains are independent
+    stages = []
+    for chain in chains:
+        for index, rename in enumerate(chain):
+            if index == len(stages):
+                stages.append([])
+            stages[index].append(rename)
+    return RenamePlan(stages)
+
+
+def renumber(frame_sequence, offset=0, mapping=None, padding=None,
+             workers=None, dry_run=False):
+    """
+    Renumber the frames of a sequence on disk.
+
+    :params frame_sequence: sequence to renumber
+    :type frame_sequence: FrameSequence
+    :params offset: added to every frame if no mapping is given
+    :type offset: int
+    :params mapping: {old frame: new frame}; frames not in it are kept
+    :type mapping: dict
+    :params padding: new frame padding, default is the current one
+    :type padding: int
+    :params workers: rename on a thread pool, via temporary names
+    :type workers: int
+    :params dry_run: only plan the renames
+    :type dry_run: bool
+    :return: the planned renames
+    :rtype: RenamePlan
+    """
+
+    plan = plan_renumber(frame_sequence, offset, mapping, padding,
+                         two_phase=bool(workers))
+    if not dry_run:
+        plan.execute(workers)
+    return plan
+
+
+# Frame flags of a SequenceReport
+FRAME_PRESENT = 1
+FRAME_DUPLICATE = 2
+FRAME_EMPTY = 4
+
+_RE_UNSET = re.compile(b'\x00+')
+_RE_SET = re.compile(b'\x01+')
+
+
+class SequenceReport(object):
+    """
+    Validation result of one frame sequence in an expected frame range
+
+    Frame presence is kept as one flag byte per frame in a bytearray plus the
+    padding of the first file found, so large ranges stay small and fast.
+    """
+
+    __slots__ = ('path', 'name', 'frame_prefix', 'ext', 'start', 'end',
+                 'flags', 'paddings', 'duplicates', 'outside')
+
+    def __init__(self, path, name, frame_prefix, ext, start, end):
+        """
+        Init an empty report.
+
+        :params path: sequence directory
+        :type path: str
+        :params name: image base name
+        :type name: str
+        :params frame_prefix: character before the frame e.g. .
+        :type frame_prefix: str
+        :params ext: image extension
+        :type ext: str
+        :params start: first expected frame
+        :type start: int
+        :params end: last expected frame, inclusive
+        :type end: int
+        """
+        self.path = path
+        self.name = name or ''
+        self.frame_prefix = frame_prefix or ''
+        self.ext = ext
+        self.start = start
+        self.end = end
+        self.flags = bytearray(end - start + 1)
+        self.paddings = bytearray(end - start + 1)
+        # frame: file names of frames found more than once
+        self.duplicates = {}
+        # frames found outside the expected range
+        self.outside = []
+
+    def __str__(self):
+        lines = ['{} {}-{}'.format(os.path.join(self.path, self.get_pattern()),
+                                   self.start, self.end)]
+        for label, ranges in (('missing', self.get_missing()),
+                              ('empty', self.get_empty()),
+                              ('outside', get_frame_ranges(self.outside))):
+            if ranges:
+                lines.append('    {}: {}'.format(label, FrameSequence(
+                    self.path, self.name, ranges=ranges).get_frame_range()))
+        for frame in sorted(self.duplicates):
+            lines.append('    duplicate {}: {}'.format(
+                frame, ', '.join(self.get_duplicate_files(frame))))
+        return '\n'.join(lines)
+
+    def get_pattern(self):
+        """
+        Get the sequence file name with a frame hash.
+
+        :return: e.g. shot.#.exr
+        :rtype: str
+        """
+
+        return self.name + self.frame_prefix + '#' + self.ext
+
+    def add(self, frame, padding, filename, size=None):
+        """
+        Mark a found frame file.
+
+        :params frame: frame number
+        :type frame: int
+        :params padding: frame digit padding of the file
+        :type padding: int
+        :params filename: file name
+        :type filename: str
+        :params size: file size in bytes if checked
+        :type size: int
+        """
+
+        index = frame - self.start
+        if index < 0 or frame > self.end:
+            self.outside.append(frame)
+            return
+
+        flags = self.flags[index]
+        if flags & FRAME_PRESENT:
+            flags |= FRAME_DUPLICATE
+            self.duplicates.setdefault(frame, []).append(filename)
+        else:
+            flags |= FRAME_PRESENT
+            self.paddings[index] = min(padding, 255)
+        if size == 0:
+            flags |= FRAME_EMPTY
+        self.flags[index] = flags
+
+    def _get_ranges(self, regex, flags):
+        """
+        Frame ranges of the runs a regex finds in the given flags.
+        """
+
+        return [(self.start + match.start(), self.start + match.end() - 1)
+                for match in regex.finditer(flags)]
+
+    def get_missing(self):
+        """
+        Get the missing frames.
+
+        :return: (first, last) frame ranges
+        :rtype: list(tuple(int))
+        """
+
+        return self._get_ranges(_RE_UNSET, self.flags)
+
+    def get_empty(self):
+        """
+        Get the frames with a zero byte file.
+
+        :return: (first, last) frame ranges
+        :rtype: list(tuple(int))
+        """
+
+        table = bytes(int(bool(flags & FRAME_EMPTY)) for flags in range(256))
+        return self._get_ranges(_RE_SET, self.flags.translate(table))
+
+    def get_duplicate_files(self, frame):
+        """
+        Get all file names of a frame found more than once.
+
+        :params frame: frame number
+        :type frame: int
+        :return: file names, the first found one first
+        :rtype: list(str)
+        """
+
+        padding = self.paddings[frame - self.start]
+        first = (self.name + self.frame_prefix +
+                 '%0{}d'.format(padding) % frame + self.ext)
+        return [first] + self.duplicates.get(frame, [])
+
+    def is_valid(self):
+        """
+        Check for a complete sequence without duplicate or empty frames.
+
+        :rtype: bool
+        """
+
+        return (not self.duplicates and not self.get_missing() and
+                not self.get_empty())
+
+
+def validate_sequences(hits, start, end, check_empty=True):
+    """
+    Validate the frame sequences of scan results in an expected frame range.
+
+    Files of one sequence with mixed frame padding are validated together,
+    so shot.1001.exr next to shot.01001.exr is reported as duplicate.
+
+    :param hits: <iterable>; (dirpath, filename) e.g. from os_path.scan_folder
+    :param start: <int>; first expected frame
+    :param end: <int>; last expected frame, inclusive
+    :param check_empty: <boolean>; stat each file to find zero byte frames
+    :return: <list>; SequenceReport objects sorted by path and pattern
+    """
+
+    reports = {}
+    for dirpath, filename in hits:
+        image = imagepath.Image(filename)
+        frame_dict = image.get_frame()
+        if not frame_dict['frame_digit']:
+            continue
+        key = (dirpath, image.get_b_name(), frame_dict['frame_prefix'],
+               image.ext)
+        report = reports.get(key)
+        if report is None:
+            report = reports[key] = SequenceReport(*(key + (start, end)))
+
+        size = None
+        if check_empty:
+            try:
+                size = os.stat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+        report.add(int(frame_dict['frame']), frame_dict['frame_padding'],
+                   filename, size)
+
+    return [reports[key] for key in sorted(reports, key=lambda k: (k[0],
+            reports[k].get_pattern()))]
+
+
+def validate_sequence(image, start, end, check_empty=True):
+    """
+    Validate the sequence of an image template in an expected frame range.
+
+    Only the directory of the image is listed.
+
+    :params image: image path or Image object, e.g. /path/shot.####.exr
+    :type image: str|imagepath.Image
+    :params start: first expected frame
+    :type start: int
+    :params end: last expected frame, inclusive
+    :type end: int
+    :params check_empty: stat each file to find zero byte frames
+    :type check_empty: bool
+    :return: report
+    :rtype: SequenceReport
+    """
+
+    if not isinstance(image, imagepath.Image):
+        image = imagepath.Image(image)
+    name_list = image._name_list
+    name = name_list[0] or ''
+    frame_prefix = name_list[1] or ''
+    dirpath = image.image_path
+    report = SequenceReport(dirpath, name, frame_prefix, image.ext, start,
+                            end)
+
+    re_frame = re.compile(re.escape(name + frame_prefix) + r'(\d+)' +
+                          re.escape(image.ext) + r'\Z')
+    for entry in os.scandir(dirpath or os.curdir):
+        match = re_frame.match(entry.name)
+        if not match:
+            continue
+        size = None
+        if check_empty:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                pass
+        report.add(int(match.group(1)), len(match.group(1)), entry.name,
+                   size)
+    return report
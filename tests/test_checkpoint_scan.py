@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=test_checkpoint_scan.py
+
+Checkpoints and resumes of checkpoint_scan.ResumableScan.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import os
+import time
+
+from .. import checkpoint_scan
+from .. import os_path
+
+
+def test_checkpoint_without_matches(tmp_path, monkeypatch):
+    root = tmp_path / 'root'
+    for index in range(20):
+        folder = root / 'd{:02d}'.format(index)
+        os.makedirs(str(folder))
+        open(str(folder / 'notes.txt'), 'w').close()
+    checkpoint_file = str(tmp_path / 'scan.checkpoint')
+
+    scan_dir = os_path._scan_dir
+    saved = []
+
+    def slow_scan_dir(dirpath, onerror=None):
+        time.sleep(0.01)
+        saved.append(os.path.exists(checkpoint_file))
+        return scan_dir(dirpath, onerror)
+
+    monkeypatch.setattr(os_path, '_scan_dir', slow_scan_dir)
+    scan = checkpoint_scan.resumable_scan_folder(str(root), r'\.exr$',
+                                                 checkpoint_file,
+                                                 interval=0.02)
+    assert list(scan) == []
+    assert any(saved)
+    assert not os.path.exists(checkpoint_file)
+
+
+def _stopped_scan(root, checkpoint_file, count):
+    """
+    Scan, take count results and stop, which writes the checkpoint.
+    """
+
+    scan = checkpoint_scan.resumable_scan_folder(root, r'\.exr$',
+                                                 checkpoint_file,
+                                                 interval=None)
+    results = [next(scan) for _ in range(count)]
+    scan.close()
+    return [filename for dirpath, filename in results]
+
+
+def test_resume_after_added_file(tmp_path):
+    for filename in ('b.exr', 'c.exr', 'd.exr'):
+        open(str(tmp_path / filename), 'w').close()
+    checkpoint_file = str(tmp_path / 'scan.checkpoint')
+    assert _stopped_scan(str(tmp_path), checkpoint_file, 2) == \
+        ['b.exr', 'c.exr']
+
+    open(str(tmp_path / 'a.exr'), 'w').close()
+    scan = checkpoint_scan.resumable_scan_folder(str(tmp_path), r'\.exr$',
+                                                 checkpoint_file)
+    assert [filename for dirpath, filename in scan] == ['d.exr']
+
+
+def test_resume_after_removed_file(tmp_path):
+    for filename in ('a.exr', 'b.exr', 'c.exr', 'd.exr'):
+        open(str(tmp_path / filename), 'w').close()
+    checkpoint_file = str(tmp_path / 'scan.checkpoint')
+    assert _stopped_scan(str(tmp_path), checkpoint_file, 3) == \
+        ['a.exr', 'b.exr', 'c.exr']
+
+    os.remove(str(tmp_path / 'a.exr'))
+    scan = checkpoint_scan.resumable_scan_folder(str(tmp_path), r'\.exr$',
+                                                 checkpoint_file)
+    assert [filename for dirpath, filename in scan] == ['d.exr']
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=test_imagepath.py
+
+Parity of Image and parse_image with the per instance regex logic of
+release 3.0.0 in baseline_imagepath.py, on fixed and randomized paths.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import random
+
+import pytest
+
+from . import baseline_imagepath
+from .. import imagepath
+
+
+FIXED_PATHS = (
+    '/show/sq010/sh010/comp/v001/sh010_comp_v001.1001.exr',
+    '/show/sq010/sh010/comp/v012/sh010_comp_v012.####.exr',
+    '/show/sq010/sh010/comp/v012/sh010_comp_v012.%04d.exr',
+    '/show/sh010/V3/sh010_V3_1001.dpx',
+    '/show/sh010/v2_3/sh010_v2_3.0042.exr',
+    '/show/sh010/v2.3/sh010_v2.3-0042.exr',
+    '/show/sh010/v001/v001_plate.1001.exr',
+    '/show/sh010/plate.1001.exr',
+    '/show/sh010/plate_v001.exr',
+    '/show/sh010/plate.exr',
+    '/show/sh010/video',
+    '/show/sh010/.hidden.exr',
+    'relative/v010/shot_v010.1.exr',
+    'shot_v010.12.exr',
+    'shot.exr',
+    '',
+    '/',
+)
+
+# Path components of the randomized paths
+ATOMS = ('v', 'V', 'v001', 'V12', '_', '.', '-', '|', '1001', '0', '%04d',
+         '####', '#', 'shot', 'a', 'video', '', '12', 'v2_3', '_v1.2', '\n')
+
+
+def _random_paths(count, seed=0):
+    rand = random.Random(seed)
+
+    def component():
+        return ''.join(rand.choice(ATOMS)
+                       for _ in range(rand.randint(0, 5)))
+
+    for _ in range(count):
+        folders = '/'.join(component() for _ in range(rand.randint(0, 5)))
+        yield (('/' if rand.random() < 0.7 else '') + folders + '/' +
+               component() + rand.choice(('.exr', '', '.dpx', '.')))
+
+
+def _get_values(module, image, major_minor):
+    """
+    Getter results of an image or the raised exception type.
+    """
+
+    try:
+        image_obj = module.Image(image)
+        return (image_obj.IMAGE_DICT, image_obj.get_image_values(major_minor),
+                image_obj.get_frame(), image_obj.get_version(major_minor),
+                image_obj.get_b_name())
+    except Exception as err:
+        return type(err)
+
+
+def _get_set_values(module, image, calls):
+    """
+    Image state after each setter call, or the raised exception types.
+    """
+
+    try:
+        image_obj = module.Image(image)
+    except Exception as err:
+        return [type(err)]
+    values = [(image_obj.IMAGE, image_obj.IMAGE_DICT)]
+    for name, args, kwargs in calls:
+        try:
+            values.append(getattr(image_obj, name)(*args, **kwargs))
+        except Exception as err:
+            values.append(type(err))
+        values.append((image_obj.IMAGE, image_obj.get_image_values(),
+                       image_obj.image_path, image_obj.name, image_obj.ext))
+    return values
+
+
+def _random_calls(rand):
+    calls = []
+    for _ in range(rand.randint(1, 5)):
+        name = rand.choice(('set_frame', 'set_b_name', 'set_version',
+                            'get_image_values', 'get_version'))
+        if name == 'set_frame':
+            args = (rand.choice(('1', '0042', '%03d', '##', 'x', 7)),)
+            kwargs = {'prefix': rand.choice((None, '_', '.'))}
+        elif name == 'set_b_name':
+            args = (rand.choice(('foo', 'bar_v3', '')),)
+            kwargs = {}
+        elif name == 'set_version':
+            args = (rand.choice(('5', '010', (2, 3), 7)),)
+            kwargs = {'set_folder': rand.random() < 0.5,
+                      'major_minor': rand.random() < 0.3,
+                      'prefix': rand.choice((None, '_v')),
+                      'sep': rand.choice((None, '.'))}
+        else:
+            args = ()
+            kwargs = {'major_minor': rand.random() < 0.5}
+        calls.append((name, args, kwargs))
+    return calls
+
+
+@pytest.mark.parametrize('major_minor', [False, True])
+@pytest.mark.parametrize('image', FIXED_PATHS)
+def test_fixed_paths(image, major_minor):
+    expected = _get_values(baseline_imagepath, image, major_minor)
+    assert _get_values(imagepath, image, major_minor) == expected
+    if not isinstance(expected, type):
+        assert imagepath.parse_image(image, major_minor) == expected[1]
+
+
+@pytest.mark.parametrize('major_minor', [False, True])
+def test_random_paths(major_minor):
+    for image in _random_paths(3000):
+        expected = _get_values(baseline_imagepath, image, major_minor)
+        assert _get_values(imagepath, image, major_minor) == expected, image
+        if not isinstance(expected, type):
+            assert imagepath.parse_image(image, major_minor) == \
+                expected[1], image
+
+
+def test_random_setters():
+    rand = random.Random(1)
+    for image in _random_paths(2000, seed=1):
+        calls = _random_calls(rand)
+        assert _get_set_values(imagepath, image, calls) == \
+            _get_set_values(baseline_imagepath, image, calls), (image, calls)
+
+
+@pytest.mark.parametrize('major_minor', [False, True])
+def test_from_path(major_minor):
+    cache = imagepath.ParseCache(100)
+    for image in list(_random_paths(500, seed=2)) * 2:
+        expected = _get_values(baseline_imagepath, image, major_minor)
+        try:
+            image_obj = imagepath.Image.from_path(image, cache)
+        except Exception as err:
+            assert expected == type(err)
+            continue
+        assert image_obj.get_image_values(major_minor) == expected[1], image
+
+
+def test_from_path_split_name_is_a_copy():
+    cache = imagepath.ParseCache()
+    image = '/show/sh010/v001/sh010_v001.1001.exr'
+    name_list = imagepath.Image.from_path(image, cache)._split_name()
+    name_list[0] = 'changed'
+    image_obj = imagepath.Image.from_path(image, cache)
+    assert image_obj.get_b_name() == 'sh010_v001'
+    assert image_obj.get_image_values()['name'] == 'sh010_v001'
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=test_parallel_walk.py
+
+parallel_walk2 on a high latency filesystem stand-in: every directory
+listing sleeps, so the walk time shows how well the listings overlap.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import os
+import threading
+import time
+
+import pytest
+
+from .. import os_path
+
+
+# Seconds every stand-in listing takes
+DELAY = 0.02
+
+
+def _make_tree(root, depth=3, fanout=3):
+    """
+    Folders with one file each, fanout sub folders down to depth levels.
+    """
+
+    folders = [str(root)]
+    for _ in range(depth):
+        folders = [os.path.join(folder, 'd{}'.format(index))
+                   for folder in folders for index in range(fanout)]
+        for folder in folders:
+            os.makedirs(folder)
+            open(os.path.join(folder, 'shot.1001.exr'), 'w').close()
+
+
+@pytest.fixture
+def slow_tree(tmp_path, monkeypatch):
+    """
+    Tree whose listings take DELAY seconds, records the number of listings.
+    """
+
+    _make_tree(tmp_path)
+    scan_dir = os_path._scan_dir
+    listed = []
+    lock = threading.Lock()
+
+    def slow_scan_dir(dirpath, onerror=None):
+        time.sleep(DELAY)
+        with lock:
+            listed.append(dirpath)
+        return scan_dir(dirpath, onerror)
+
+    monkeypatch.setattr(os_path, '_scan_dir', slow_scan_dir)
+    return str(tmp_path), listed
+
+
+def _walk_seconds(top, workers, ordered=True):
+    start = time.perf_counter()
+    for _ in os_path.parallel_walk2(top, workers, ordered):
+        pass
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_same_result_as_walk2(slow_tree, ordered):
+    top, listed = slow_tree
+    expected = [(d, sorted(n), sorted(f)) for d, n, f in os_path.walk2(top)]
+    result = [(d, sorted(n), sorted(f))
+              for d, n, f in os_path.parallel_walk2(top, 4, ordered)]
+    if ordered:
+        assert result == expected
+    else:
+        assert sorted(result) == sorted(expected)
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_speedup_scales_with_workers(slow_tree, ordered):
+    top, listed = slow_tree
+    seconds = dict((workers, _walk_seconds(top, workers, ordered))
+                   for workers in (1, 2, 8))
+    # 40 listings: about 0.8s on one worker, 0.4s on two, 0.1s on eight
+    assert seconds[2] < seconds[1] * 0.75
+    assert seconds[8] < seconds[2] * 0.75
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_listings_ahead_are_bounded(slow_tree, ordered):
+    top, listed = slow_tree
+    workers = 2
+    ahead = 0
+    for count, _ in enumerate(os_path.parallel_walk2(top, workers, ordered),
+                              1):
+        # let the pool run ahead of a slow caller
+        time.sleep(DELAY * 2)
+        ahead = max(ahead, len(listed) - count)
+    assert len(listed) == count
+    assert ahead <= workers * os_path.PREFETCH
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=test_verify.py
+
+Manifest round trips of verify.write_manifest and verify.verify.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import os
+
+from .. import os_path
+from .. import verify
+
+
+def _write_files(root, filenames):
+    for filename in filenames:
+        with open(os.path.join(str(root), filename), 'w') as image_file:
+            image_file.write(filename)
+
+
+def test_frame_only_filenames(tmp_path):
+    filenames = ('1001.exr', '1002.exr', '_1003.exr', 'shot.1001.exr')
+    _write_files(tmp_path, filenames)
+    manifest_file = str(tmp_path / 'manifest.md5')
+    hits = list(os_path.scan_folder(str(tmp_path), r'\.exr$'))
+    assert verify.write_manifest(manifest_file, hits) == len(filenames)
+
+    result = verify.verify(hits, manifest_file)
+    assert result.is_valid()
+    patterns = [(check.pattern, check.ok) for check in result.sequences]
+    assert patterns == [('#.exr', 2), ('_#.exr', 1), ('shot.#.exr', 1)]
+
+
+def test_mismatched_and_missing(tmp_path):
+    _write_files(tmp_path, ('shot.1001.exr', 'shot.1002.exr'))
+    manifest_file = str(tmp_path / 'manifest.md5')
+    hits = list(os_path.scan_folder(str(tmp_path), r'\.exr$'))
+    verify.write_manifest(manifest_file, hits)
+
+    with open(str(tmp_path / 'shot.1001.exr'), 'w') as image_file:
+        image_file.write('changed')
+    os.remove(str(tmp_path / 'shot.1002.exr'))
+    hits = list(os_path.scan_folder(str(tmp_path), r'\.exr$'))
+
+    result = verify.verify(hits, manifest_file)
+    assert not result.is_valid()
+    check, = result.sequences
+    assert check.mismatched == ['shot.1001.exr']
+    assert check.missing == ['shot.1002.exr']
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=test_versions.py
+
+Version lookups of versions.VersionResolver in version folders and files.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import os
+
+import pytest
+
+from .. import versions
+
+
+@pytest.fixture
+def shot(tmp_path):
+    for folder in ('v001', 'v002', 'v010'):
+        os.makedirs(str(tmp_path / 'sh010' / folder))
+    return str(tmp_path / 'sh010')
+
+
+def test_folder_and_file_version(shot):
+    image = os.path.join(shot, 'v001', 'sh010_v1.1001.exr')
+    assert versions.VersionResolver().get_versions(image) == [
+        (1, image),
+        (2, os.path.join(shot, 'v002', 'sh010_v2.1001.exr')),
+        (10, os.path.join(shot, 'v010', 'sh010_v10.1001.exr'))]
+
+
+def test_other_file_version_is_kept(shot):
+    image = os.path.join(shot, 'v002', 'sh010_v003.exr')
+    result = versions.VersionResolver().get_versions(image)
+    assert result[1] == (2, image)
+    assert result[2] == (10, os.path.join(shot, 'v010', 'sh010_v003.exr'))
+
+
+def test_major_minor_file_version_is_kept(shot):
+    image = os.path.join(shot, 'v001', 'sh010_v1_3.exr')
+    assert versions.VersionResolver().get_versions(image, True) == [
+        (1, image),
+        (2, os.path.join(shot, 'v002', 'sh010_v1_3.exr')),
+        (10, os.path.join(shot, 'v010', 'sh010_v1_3.exr'))]
+
+
+def test_file_versions(tmp_path):
+    for filename in ('plate_v001.exr', 'plate_v002.exr', 'plate_v2_1.exr',
+                     'other_v003.exr'):
+        open(str(tmp_path / filename), 'w').close()
+    image = str(tmp_path / 'plate_v001.exr')
+    assert versions.get_latest_version(image) == \
+        str(tmp_path / 'plate_v002.exr')
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=test_watch.py
+
+Watcher index updates of real inotify events, Linux only.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import os
+
+import pytest
+
+from .. import watch
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    os.makedirs(str(tmp_path / 'a'))
+    os.makedirs(str(tmp_path / 'b' / 'x' / 'y'))
+    open(str(tmp_path / 'b' / 'x' / 'shot.1001.exr'), 'w').close()
+    try:
+        watcher = watch.Watcher(str(tmp_path), r'\.exr$', coalesce=0.05)
+    except OSError as err:
+        pytest.skip('inotify is not available: {}'.format(err))
+    yield watcher
+    watcher.close()
+
+
+def test_new_file(watcher, tmp_path):
+    open(str(tmp_path / 'a' / 'shot.1001.exr'), 'w').close()
+    watcher.poll(1.0)
+    assert watcher.index[str(tmp_path / 'a')] == set(['shot.1001.exr'])
+
+
+def test_moved_directory_stays_watched(watcher, tmp_path):
+    os.rename(str(tmp_path / 'b' / 'x'), str(tmp_path / 'a' / 'x'))
+    watcher.poll(1.0)
+    assert str(tmp_path / 'b' / 'x') not in watcher.index
+    assert watcher.index[str(tmp_path / 'a' / 'x')] == \
+        set(['shot.1001.exr'])
+
+    open(str(tmp_path / 'a' / 'x' / 'shot.1002.exr'), 'w').close()
+    open(str(tmp_path / 'a' / 'x' / 'y' / 'shot.1001.exr'), 'w').close()
+    watcher.poll(1.0)
+    assert watcher.index[str(tmp_path / 'a' / 'x')] == \
+        set(['shot.1001.exr', 'shot.1002.exr'])
+    assert watcher.index[str(tmp_path / 'a' / 'x' / 'y')] == \
+        set(['shot.1001.exr'])
@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=verify.py
+
+Checksum verification of delivered frame sequences.
+Files are hashed concurrently on a thread or process pool; large files are
+read through mmap, hashlib releases the GIL while hashing big buffers. The
+hashes are compared with a manifest in md5sum format and reported per frame
+sequence with the mismatched, missing and unlisted frames and the MB/s.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import hashlib
+import mmap
+import os
+import time
+from concurrent import futures
+
+from . import imagepath
+from . import sequence
+
+
+# Files of at least this size are hashed through mmap
+MMAP_SIZE = 1 << 20
+# Read size of smaller files and of files that can not be mapped
+BUFFER_SIZE = 1 << 20
+
+
+def hash_file(image, algorithm='md5', use_mmap=True):
+    """
+    Hash a file.
+
+    :params image: file path
+    :type image: str
+    :params algorithm: hashlib algorithm name
+    :type algorithm: str
+    :params use_mmap: map files of at least MMAP_SIZE bytes
+    :type use_mmap: bool
+    :return: hex digest, size in bytes, seconds
+    :rtype: tuple
+    """
+
+    start = time.perf_counter()
+    file_hash = hashlib.new(algorithm)
+    with open(image, 'rb') as image_file:
+        size = os.fstat(image_file.fileno()).st_size
+        mapped = None
+        if use_mmap and size >= MMAP_SIZE:
+            try:
+                mapped = mmap.mmap(image_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+        if mapped is not None:
+            with mapped:
+                file_hash.update(mapped)
+        else:
+            buf = bytearray(BUFFER_SIZE)
+            view = memoryview(buf)
+            while True:
+                length = image_file.readinto(buf)
+                if not length:
+                    break
+                file_hash.update(view[:length])
+    return file_hash.hexdigest(), size, time.perf_counter() - start
+
+
+def load_manifest(manifest_file):
+    """
+    Read a manifest in md5sum format: "<hex digest>  <relative path>".
+
+    :params manifest_file: manifest path
+    :type manifest_file: str
+    :return: normalized relative path: hex digest
+    :rtype: dict
+    """
+
+    manifest = {}
+    with open(manifest_file, encoding='utf-8', errors='surrogateescape') \
+            as manifest_lines:
+        for line in manifest_lines:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            digest, image = line.split(' ', 1)
+            # md5sum marks binary mode with a *
+            image = image[1:] if image[:1] in (' ', '*') else image
+            manifest[os.path.normpath(image)] = digest.lower()
+    return manifest
+
+
+def write_manifest(manifest_file, images, root=None, algorithm='md5',
+                   workers=8, processes=False):
+    """
+    Hash images and write a manifest in md5sum format.
+
+    :params manifest_file: manifest path
+    :type manifest_file: str
+    :params images: image paths, (dirpath, filename) hits or
+                    sequence.FrameSequence objects
+    :type images: iterable
+    :params root: folder the manifest paths are relative to,
+                  the manifest folder if None
+    :type root: str
+    :params algorithm: hashlib algorithm name
+    :type algorithm: str
+    :params workers: number of hashing threads or processes
+    :type workers: int
+    :params processes: hash on a process pool instead of threads
+    :type processes: bool
+    :return: number of written entries
+    :rtype: int
+    """
+
+    if root is None:
+        root = os.path.dirname(os.path.abspath(manifest_file))
+    paths = sorted(set(_iter_paths(images)))
+    count = 0
+    with open(manifest_file, 'w', encoding='utf-8',
+              errors='surrogateescape') as manifest:
+        for image, result in _hash_all(paths, algorithm, workers, processes):
+            if isinstance(result, Exception):
+                raise result
+            manifest.write('{}  {}\n'.format(
+                result[0], os.path.relpath(image, root)))
+            count += 1
+    return count
+
+
+def _iter_paths(images):
+    """
+    Image paths of paths, scan hits or frame sequences.
+    """
+
+    for image in images:
+        if isinstance(image, sequence.FrameSequence):
+            if not image.padding:
+                yield os.path.abspath(image.get_frame_path(None))
+            for frame in image:
+                yield os.path.abspath(image.get_frame_path(frame))
+        elif isinstance(image, tuple):
+            yield os.path.abspath(os.path.join(image[0], image[1]))
+        else:
+            yield os.path.abspath(image)
+
+
+def _hash_all(paths, algorithm, workers, processes, use_mmap=True):
+    """
+    Hash paths on a pool, yield (path, (digest, size, seconds)) or
+    (path, exception) as completed.
+    """
+
+    if processes:
+        executor = futures.ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = futures.ThreadPoolExecutor(max_workers=workers)
+    with executor:
+        jobs = dict((executor.submit(hash_file, path, algorithm, use_mmap),
+                     path) for path in paths)
+        for job in futures.as_completed(jobs):
+            try:
+                yield jobs[job], job.result()
+            except OSError as err:
+                yield jobs[job], err
+
+
+class SequenceCheck(object):
+    """
+    Verification result of one frame sequence
+    """
+
+    __slots__ = ('path', 'pattern', 'ok', 'mismatched', 'missing',
+                 'unlisted', 'errors', 'size', 'seconds')
+
+    def __init__(self, path, pattern):
+        """
+        Init an empty result.
+
+        :params path: sequence directory
+        :type path: str
+        :params pattern: file name with a frame hash e.g. shot.#.exr
+        :type pattern: str
+        """
+        self.path = path
+        self.pattern = pattern
+        # number of matching frames
+        self.ok = 0
+        # file names
+        self.mismatched = []
+        self.missing = []
+        self.unlisted = []
+        self.errors = []
+        # hashed bytes and hashing seconds summed over the files
+        self.size = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        status = 'OK' if self.is_valid() else 'FAILED'
+        lines = ['{} {} ok: {}, {:.1f} MB/s'.format(
+            status, os.path.join(self.path, self.pattern), self.ok,
+            self.get_mb_per_sec())]
+        for label in ('mismatched', 'missing', 'unlisted', 'errors'):
+            names = getattr(self, label)
+            if names:
+                lines.append('    {}: {}'.format(label,
+                                                 ', '.join(sorted(names))))
+        return '\n'.join(lines)
+
+    def is_valid(self):
+        """
+        Check for matching hashes of all manifest frames.
+
+        Unlisted frames are reported but do not fail the check.
+
+        :rtype: bool
+        """
+
+        return not (self.mismatched or self.missing or self.errors)
+
+    def get_mb_per_sec(self):
+        """
+        Hashing throughput of one hashing thread or process.
+
+        :rtype: float
+        """
+
+        if not self.seconds:
+            return 0.0
+        return self.size / self.seconds / 1e6
+
+
+class VerifyResult(object):
+    """
+    Verification results of all sequences plus totals
+    """
+
+    __slots__ = ('sequences', 'size', 'seconds')
+
+    def __init__(self, sequences, size, seconds):
+        """
+        :params sequences: results sorted by path and pattern
+        :type sequences: list(SequenceCheck)
+        :params size: hashed bytes
+        :type size: int
+        :params seconds: wall time
+        :type seconds: float
+        """
+        self.sequences = sequences
+        self.size = size
+        self.seconds = seconds
+
+    def __str__(self):
+        lines = [str(check) for check in self.sequences]
+        lines.append('{} of {} sequences valid, {} bytes, {:.1f} MB/s'.format(
+            sum(1 for check in self.sequences if check.is_valid()),
+            len(self.sequences), self.size, self.get_mb_per_sec()))
+        return '\n'.join(lines)
+
+    def is_valid(self):
+        """
+        Check all sequences.
+
+        :rtype: bool
+        """
+
+        return all(check.is_valid() for check in self.sequences)
+
+    def get_mb_per_sec(self):
+        """
+        Overall throughput of the wall time.
+
+        :rtype: float
+        """
+
+        if not self.seconds:
+            return 0.0
+        return self.size / self.seconds / 1e6
+
+
+def _get_check(checks, image):
+    """
+    Get the SequenceCheck of an image path, create it if missing.
+    """
+
+    dirpath, filename = os.path.split(image)
+    image_obj = imagepath.Image(filename)
+    frame_dict = image_obj.get_frame()
+    if frame_dict['frame_digit']:
+        pattern = ((image_obj.get_b_name() or '') +
+                   (frame_dict['frame_prefix'] or '') + '#' + image_obj.ext)
+    else:
+        pattern = filename
+    key = (dirpath, pattern)
+    check = checks.get(key)
+    if check is None:
+        check = checks[key] = SequenceCheck(dirpath, pattern)
+    return check
+
+
+def verify(images, manifest_file, root=None, algorithm='md5', workers=8,
+           processes=False, use_mmap=True):
+    """
+    Hash images and compare them with a manifest.
+
+    Frames in the manifest of a sequence that are not among the images are
+    reported missing; manifest sequences without any image are reported
+    with all frames missing.
+
+    :params images: image paths, (dirpath, filename) hits e.g. of
+                    os_path.scan_folder or sequence.FrameSequence objects
+    :type images: iterable
+    :params manifest_file: manifest in md5sum format
+    :type manifest_file: str
+    :params root: folder the manifest paths are relative to,
+                  the manifest folder if None
+    :type root: str
+    :params algorithm: hashlib algorithm name of the manifest
+    :type algorithm: str
+    :params workers: number of hashing threads or processes
+    :type workers: int
+    :params processes: hash on a process pool instead of threads
+    :type processes: bool
+    :params use_mmap: map large files instead of reading them
+    :type use_mmap: bool
+    :return: result per sequence
+    :rtype: VerifyResult
+    """
+
+    start = time.perf_counter()
+    if root is None:
+        root = os.path.dirname(os.path.abspath(manifest_file))
+    root = os.path.abspath(root)
+    expected = load_manifest(manifest_file)
+    paths = set(_iter_paths(images))
+
+    checks = {}
+    size = 0
+    for image, result in _hash_all(sorted(paths), algorithm, workers,
+                                   processes, use_mmap):
+        check = _get_check(checks, image)
+        filename = os.path.basename(image)
+        relpath = os.path.normpath(os.path.relpath(image, root))
+        digest = expected.pop(relpath, None)
+        if isinstance(result, Exception):
+            check.errors.append(filename)
+            continue
+        check.size += result[1]
+        check.seconds += result[2]
+        size += result[1]
+        if digest is None:
+            check.unlisted.append(filename)
+        elif digest == result[0]:
+            check.ok += 1
+        else:
+            check.mismatched.append(filename)
+
+    for relpath in expected:
+        image = os.path.join(root, relpath)
+        _get_check(checks, image).missing.append(os.path.basename(image))
+
+    sequences = [checks[key] for key in sorted(checks)]
+    return VerifyResult(sequences, size, time.perf_counter() - start)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=versions.py
+
+Resolve the existing and latest versions of an image.
+Only the directory holding the version is listed: the parent of the version
+folder, or the image folder if only the file name is versioned. Listings are
+cached for a short time, as the same levels are asked for over and over.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import os
+import re
+import threading
+import time
+
+from . import imagepath
+
+
+class VersionResolver(object):
+    """
+    Latest version lookup with a short lived directory listing cache
+    """
+
+    def __init__(self, ttl=5.0, max_dirs=10000):
+        """
+        Init the resolver.
+
+        :params ttl: seconds a directory listing is reused
+        :type ttl: float
+        :params max_dirs: max number of cached listings
+        :type max_dirs: int
+        """
+        self.ttl = ttl
+        self.max_dirs = max_dirs
+
+        # private vars
+        self._listings = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """
+        Drop all cached listings.
+        """
+
+        with self._lock:
+            self._listings.clear()
+
+    def listdir(self, dirpath):
+        """
+        List a directory, cached for ttl seconds.
+
+        :params dirpath: directory to list
+        :type dirpath: str
+        :return: entry names, empty if the directory can not be listed
+        :rtype: list(str)
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._listings.get(dirpath)
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+
+        try:
+            names = os.listdir(dirpath)
+        except OSError:
+            names = []
+
+        with self._lock:
+            if len(self._listings) >= self.max_dirs:
+                self._listings = dict(
+                    (key, value) for key, value in self._listings.items()
+                    if now - value[0] < self.ttl)
+                if len(self._listings) >= self.max_dirs:
+                    self._listings.clear()
+            self._listings[dirpath] = (now, names)
+        return names
+
+    def get_versions(self, image, major_minor=False):
+        """
+        Get all existing versions of an image, sorted numerically.
+
+        With a version folder the sibling version folders are listed and the
+        image is moved into each of them; the image itself is not checked
+        inside them. A file version equal to the folder version follows the
+        folder with its own prefix and padding, other file names are kept.
+        Major, minor file versions are always kept. Without a version folder
+        the versioned files next to the image are listed.
+
+        :params image: image path or Image object
+        :type image: str|imagepath.Image
+        :params major_minor: Set to True if the file version is using
+                             major, minor version style
+        :type major_minor: bool
+        :return: (version, image) tuples, version as int or (major, minor)
+        :rtype: list(tuple)
+        """
+
+        if isinstance(image, imagepath.Image):
+            image = image.IMAGE
+        image_obj = imagepath.Image(image)
+        version_dict = image_obj.get_version(major_minor)
+
+        level = version_dict['version_folder_level']
+        if level:
+            folders = image_obj.image_path.split(os.sep)
+            parent = os.sep.join(folders[:-level])
+            re_version = self._re_version(folders[-level], folder=True)
+            versions = []
+            for name in self.listdir(parent or os.sep):
+                match = re_version.match(name)
+                if match:
+                    version = int(match.group(1))
+                    folders[-level] = name
+                    filename = self._get_file_name(image_obj, version_dict,
+                                                   version, major_minor)
+                    versions.append((version, os.path.join(
+                        os.sep.join(folders), filename)))
+        elif version_dict['version']:
+            re_version = self._re_version(image_obj.name, major_minor,
+                                          image_obj.ext)
+            versions = []
+            for name in self.listdir(image_obj.image_path or os.curdir):
+                match = re_version.match(name)
+                if not match:
+                    continue
+                if major_minor:
+                    version = (int(match.group(1)), int(match.group(2)))
+                else:
+                    version = int(match.group(1))
+                versions.append((version,
+                                 os.path.join(image_obj.image_path, name)))
+        else:
+            return []
+
+        versions.sort()
+        return versions
+
+    def get_latest(self, image, major_minor=False):
+        """
+        Get the latest existing version of an image.
+
+        :params image: image path or Image object
+        :type image: str|imagepath.Image
+        :params major_minor: Set to True if the file version is using
+                             major, minor version style
+        :type major_minor: bool
+        :return: image of the latest version or None
+        :rtype: str
+        """
+
+        versions = self.get_versions(image, major_minor)
+        if not versions:
+            return None
+        return versions[-1][1]
+
+    def _get_file_name(self, image_obj, version_dict, version, major_minor):
+        """
+        File name of an image moved into another version folder.
+
+        :return: file name with the file version of the folder version
+                 if it had the version of its own folder
+        :rtype: str
+        """
+
+        name = image_obj.name
+        file_version = version_dict['version']
+        if major_minor or not file_version or \
+                int(file_version) != int(version_dict['version_folder']):
+            return name + image_obj.ext
+        match = imagepath.RE_NAME.match(name)
+        if match.group('version_prefix') is not None:
+            start, end = match.span('version')
+        else:
+            start, end = match.span('version_only')
+        return (name[:start] + str(version).zfill(end - start) + name[end:] +
+                image_obj.ext)
+
+    def _re_version(self, name, major_minor=False, ext='', folder=False):
+        """
+        Regex matching a name with any version number in place of its own.
+
+        :return: regex with the version digits as groups
+        :rtype: re object
+        """
+
+        if folder:
+            match = imagepath.RE_FOLDER.match(name)
+            if match.group('version_prefix') is not None:
+                spans = [match.span('version')]
+            else:
+                spans = [match.span('version_only')]
+        elif major_minor:
+            match = imagepath.RE_NAME_MAJOR_MINOR.match(name)
+            spans = [match.span('version'), match.span('version_minor')]
+        else:
+            match = imagepath.RE_NAME.match(name)
+            if match.group('version_prefix') is not None:
+                spans = [match.span('version')]
+            else:
+                spans = [match.span('version_only')]
+
+        pattern = ''
+        position = 0
+        for start, end in spans:
+            pattern += re.escape(name[position:start]) + r'(\d+)'
+            position = end
+        pattern += re.escape(name[position:] + ext) + r'\Z'
+        return re.compile(pattern)
+
+
+# Shared resolver of the module functions
+_RESOLVER = VersionResolver()
+
+
+def get_versions(image, major_minor=False):
+    """
+    Get all existing versions of an image; see VersionResolver.get_versions.
+    """
+
+    return _RESOLVER.get_versions(image, major_minor)
+
+
+def get_latest_version(image, major_minor=False):
+    """
+    Get the latest version of an image; see VersionResolver.get_latest.
+    """
+
+    return _RESOLVER.get_latest(image, major_minor)
@@ -0,0 +1,441 @@
+#!/usr/bin/env python
+
+# Copyright 2019 Wilfried Pollan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   # http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+file=watch.py
+
+Live file index of a root folder kept current by Linux inotify events.
+The initial index follows the os_path.walk2 options. Event bursts are
+coalesced and the touched directories listed once, the subscribers get the
+added and removed images. Directories that can not be watched, e.g. when the
+inotify watch limit is exhausted, are rescanned periodically instead.
+"""
+
+__author__ = 'Wilfried Pollan'
+
+
+# Imports
+import ctypes
+import ctypes.util
+import errno
+import os
+import re
+import select
+import struct
+import time
+
+from . import imagepath
+from . import os_path
+from . import sequence
+
+
+# inotify constants, see <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+              IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT = struct.Struct('iIII')
+
+
+class _Inotify(object):
+    """
+    Minimal ctypes binding of the Linux inotify API
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        try:
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            self._libc.inotify_init1
+        except (OSError, AttributeError):
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path):
+        """
+        Watch a directory.
+
+        :return: watch descriptor
+        :rtype: int
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path),
+                                          WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout):
+        """
+        Read all pending events.
+
+        :return: (wd, mask, name) tuples
+        :rtype: list(tuple)
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watcher(object):
+    """
+    Live index of the files below a root folder matching a search pattern
+    """
+
+    def __init__(self, path, search_pattern, followlinks=False, level=False,
+                 excludes=None, coalesce=0.2, rescan_interval=60):
+        """
+        Init the watcher and build the initial index.
+
+        :params path: search root path
+        :type path: str
+        :params search_pattern: regex string
+        :type search_pattern: str
+        :params followlinks: see os.walk
+        :type followlinks: bool
+        :params level: folder search level depth
+        :type level: int
+        :params excludes: dirnames to exclude; see os_path.walk2
+        :type excludes: str|list
+        :params coalesce: seconds to collect events before processing them
+        :type coalesce: float
+        :params rescan_interval: seconds between rescans of directories
+                                 that could not be watched
+        :type rescan_interval: float
+        """
+
+        # Compile search pattern regex
+        try:
+            self._re_search = re.compile(search_pattern, re.IGNORECASE)
+        except TypeError:
+            raise TypeError('Expected regex search string')
+
+        # Check the path
+        if not os.path.isdir(path):
+            raise OSError('Path does not exist')
+
+        self.path = os_path._check_top(os.path.normpath(path), level)
+        self.followlinks = followlinks
+        self.level = level
+        self.coalesce = coalesce
+        self.rescan_interval = rescan_interval
+
+        # dirpath: set of found filenames
+        self.index = {}
+
+        # private vars
+        self._is_excluded = os_path._get_exclude_test(excludes)
+        self._inotify = _Inotify()
+        self._wds = {}
+        self._watched = {}
+        self._depths = {}
+        self._polled = set()
+        self._last_rescan = time.time()
+        self._subscribers = []
+        self._added = []
+        self._removed = []
+
+        self._scan_tree(self.path, 0)
+        self._added = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Stop watching.
+        """
+
+        self._inotify.close()
+
+    def subscribe(self, callback, sequences=False):
+        """
+        Register a callback for index changes.
+
+        :params callback: called with (added, removed) lists of
+                          imagepath.Image objects
+        :type callback: function
+        :params sequences: pass sequence.FrameSequence deltas instead
+        :type sequences: bool
+        """
+
+        self._subscribers.append((callback, sequences))
+
+    def get_images(self):
+        """
+        Get all indexed images.
+
+        :return: image paths
+        :rtype: generator(str)
+        """
+
+        for dirpath, filenames in self.index.items():
+            for filename in filenames:
+                yield os.path.join(dirpath, filename)
+
+    def _watch(self, dirpath):
+        """
+        Add an inotify watch, poll the directory if that fails.
+
+        A directory removed in the meantime is dropped from the index.
+        """
+
+        try:
+            wd = self._inotify.add_watch(dirpath)
+        except OSError as err:
+            if err.errno in (errno.ENOENT, errno.ENOTDIR):
+                self._forget(dirpath)
+                return
+            if err.errno not in (errno.ENOSPC, errno.ENOMEM, errno.EACCES,
+                                 errno.EPERM):
+                raise
+            self._polled.add(dirpath)
+            return
+        self._wds[wd] = dirpath
+        self._watched[dirpath] = wd
+
+    def _scan_tree(self, top, depth):
+        """
+        Watch and index a new directory tree.
+        """
+
+        stack = [(top, depth)]
+        while stack:
+            dirpath, depth = stack.pop()
+            self._watch(dirpath)
+            listing = os_path._scan_dir(dirpath)
+            if listing is None:
+                self._forget(dirpath)
+                continue
+            dir_entries, file_entries = listing
+
+            self._depths[dirpath] = depth
+            filenames = set(e.name for e in file_entries
+                            if self._re_search.search(e.name))
+            self.index[dirpath] = filenames
+            self._added.extend(os.path.join(dirpath, f) for f in filenames)
+
+            for entry in dir_entries:
+                if self._is_walked(entry, depth):
+                    stack.append((entry.path, depth + 1))
+
+    def _is_walked(self, entry, depth):
+        """
+        Test a sub-directory against the walk2 options.
+        """
+
+        if self.level and depth >= self.level:
+            return False
+        if self._is_excluded is not None and self._is_excluded(entry.name):
+            return False
+        return self.followlinks or not os_path._is_symlink(entry)
+
+    def _forget(self, top):
+        """
+        Drop a removed directory tree from the index.
+        """
+
+        prefix = top.rstrip(os.sep) + os.sep
+        for dirpath in [d for d in self.index
+                        if d == top or d.startswith(prefix)]:
+            filenames = self.index.pop(dirpath)
+            self._removed.extend(os.path.join(dirpath, f) for f in filenames)
+            self._depths.pop(dirpath, None)
+            self._polled.discard(dirpath)
+            wd = self._watched.pop(dirpath, None)
+            # a directory moved within the root keeps its wd, which may
+            # already be registered for the new path
+            if wd is not None and self._wds.get(wd) == dirpath:
+                del self._wds[wd]
+                self._inotify.rm_watch(wd)
+        self._polled.discard(top)
+
+    def _refresh_dir(self, dirpath):
+        """
+        List a changed directory again and update the index.
+        """
+
+        if dirpath not in self.index:
+            return
+        listing = os_path._scan_dir(dirpath)
+        if listing is None:
+            self._forget(dirpath)
+            return
+        dir_entries, file_entries = listing
+
+        filenames = set(e.name for e in file_entries
+                        if self._re_search.search(e.name))
+        old_filenames = self.index[dirpath]
+        self._added.extend(os.path.join(dirpath, f)
+                           for f in filenames - old_filenames)
+        self._removed.extend(os.path.join(dirpath, f)
+                             for f in old_filenames - filenames)
+        self.index[dirpath] = filenames
+
+        depth = self._depths[dirpath]
+        subdirs = set()
+        for entry in dir_entries:
+            if self._is_walked(entry, depth):
+                subdirs.add(entry.path)
+                if entry.path not in self.index:
+                    self._scan_tree(entry.path, depth + 1)
+
+        prefix = dirpath.rstrip(os.sep) + os.sep
+        for child in [d for d in self.index if d.startswith(prefix) and
+                      os.path.dirname(d) == dirpath and d not in subdirs]:
+            self._forget(child)
+
+    def poll(self, timeout=None):
+        """
+        Wait for events and process them.
+
+        Events arriving within the coalesce time after the first one are
+        processed together, every touched directory is listed once.
+
+        :params timeout: seconds to wait for the first event, None waits
+                         until the next periodic rescan
+        :type timeout: float
+        :return: number of added and removed images
+        :rtype: int
+        """
+
+        if timeout is None:
+            timeout = max(0, self._last_rescan + self.rescan_interval -
+                          time.time())
+        events = self._inotify.read(timeout)
+        if events and self.coalesce:
+            deadline = time.time() + self.coalesce
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                events.extend(self._inotify.read(remaining))
+
+        dirty = set()
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                dirty.update(self.index)
+                continue
+            dirpath = self._wds.get(wd)
+            if dirpath is None:
+                continue
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                self._watched.pop(dirpath, None)
+                dirty.add(os.path.dirname(dirpath))
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                dirty.add(os.path.dirname(dirpath))
+            else:
+                dirty.add(dirpath)
+
+        if time.time() - self._last_rescan >= self.rescan_interval:
+            self._last_rescan = time.time()
+            self._rescan_polled(dirty)
+
+        for dirpath in sorted(dirty):
+            self._refresh_dir(dirpath)
+        return self._notify()
+
+    def _rescan_polled(self, dirty):
+        """
+        Add the directories without watch to the dirty ones, retry watching.
+        """
+
+        polled = self._polled
+        self._polled = set()
+        for dirpath in polled:
+            if dirpath in self.index:
+                self._watch(dirpath)
+                dirty.add(dirpath)
+
+    def run(self, stop=None):
+        """
+        Process events until stopped.
+
+        :params stop: function returning True to stop e.g. threading.Event.is_set
+        :type stop: function
+        """
+
+        while stop is None or not stop():
+            self.poll(1.0 if stop is not None else None)
+
+    def _notify(self):
+        """
+        Pass the collected changes on to the subscribers.
+        """
+
+        added, self._added = self._added, []
+        removed, self._removed = self._removed, []
+        if not added and not removed:
+            return 0
+
+        for callback, sequences in self._subscribers:
+            if sequences:
+                callback(self._collapse(added), self._collapse(removed))
+            else:
+                callback([imagepath.Image(image) for image in added],
+                         [imagepath.Image(image) for image in removed])
+        return len(added) + len(removed)
+
+    def _collapse(self, images):
+        """
+        Group image paths into frame sequences per directory.
+        """
+
+        dirs = {}
+        for image in images:
+            dirpath, filename = os.path.split(image)
+            dirs.setdefault(dirpath, []).append(filename)
+        sequences = []
+        for dirpath in sorted(dirs):
+            sequences.extend(sequence.collapse(dirpath, dirs[dirpath]))
+        return sequences